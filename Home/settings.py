@@ -62,6 +62,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'school.context_processors.notifications',
             ],
         },
     },
@@ -154,4 +155,17 @@ MEDIA_URL = '/media/'
 # The file system path to the directory where media files will be stored
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
 
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
\ No newline at end of file
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+# Uploaded media is stored once per distinct content (see school/storage.py)
+STORAGES = {
+    'default': {
+        'BACKEND': 'school.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Notifications are buffered and written in batches (see school/notifications.py);
+# tests that assert on the table right away override this with 'sync'
+NOTIFICATION_MODE = 'buffered'
@@ -1,3 +1,10 @@
 from django.contrib import admin
 
 # Register your models here.
+from .models import ModelTrainingJob
+
+@admin.register(ModelTrainingJob)
+class ModelTrainingJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'model_name', 'status', 'progress', 'mse', 'duration', 'requested_by', 'created_at')
+    list_filter = ('status',)
+    readonly_fields = ('started_at', 'finished_at')
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analytics'
+
+    def ready(self):
+        from . import signals
+
+        # Dedicated analytics workers can opt in to paying the numpy/sklearn
+        # import and model load at boot instead of on their first request
+        if getattr(settings, 'ANALYTICS_WARM_UP', False):
+            from .models import MLModel
+            MLModel.warm_up()
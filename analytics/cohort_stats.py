@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import StudentGrade, LOW_RISK_THRESHOLD, MEDIUM_RISK_THRESHOLD
+
+GROUPINGS = ('class', 'section', 'subject')
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+GENERATION_KEY = 'analytics:cohort_stats:generation'
+STATS_KEY = 'analytics:cohort_stats:{generation}'
+
+# Grade changes bump the generation through signals. With a per-process cache
+# (the default LocMemCache) other workers only see that after this timeout;
+# with a shared cache backend invalidation is immediate everywhere.
+CACHE_TIMEOUT = getattr(settings, 'ANALYTICS_STATS_CACHE_TIMEOUT', 300)
+
+
+def invalidate():
+    """Make the next stats request recompute from the grade table"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, None)
+
+
+def get_cohort_stats(grouping):
+    """Cached grade distribution for each class, class/section or subject"""
+    generation = cache.get_or_set(GENERATION_KEY, 1, None)
+    key = STATS_KEY.format(generation=generation)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_cohort_stats()
+        cache.set(key, stats, CACHE_TIMEOUT)
+    return stats[grouping]
+
+
+def compute_cohort_stats():
+    """Aggregate every grade once and group it by class, section and subject.
+
+    A single values_list query joins each grade to its student's class and
+    section; grouping and percentiles are done in NumPy.
+    """
+    import numpy as np
+
+    rows = list(StudentGrade.objects.values_list(
+        'student__student_class', 'student__section', 'subject__name', 'final_grade'
+    ))
+    grades = np.fromiter((row[3] for row in rows), dtype=float, count=len(rows))
+    keys = {
+        'class': [row[0] for row in rows],
+        'section': [f"{row[0]} {row[1]}" for row in rows],
+        'subject': [row[2] for row in rows],
+    }
+    return {grouping: _group_stats(np.array(keys[grouping], dtype=str), grades) for grouping in GROUPINGS}
+
+
+def _group_stats(labels, grades):
+    import numpy as np
+
+    if len(grades) == 0:
+        return []
+
+    names, inverse = np.unique(labels, return_inverse=True)
+    # Sort by group, then grade, so each group is one contiguous sorted slice
+    order = np.lexsort((grades, inverse))
+    sorted_grades = grades[order]
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(inverse))))
+
+    high = np.bincount(inverse, weights=grades < MEDIUM_RISK_THRESHOLD, minlength=len(names))
+    low = np.bincount(inverse, weights=grades >= LOW_RISK_THRESHOLD, minlength=len(names))
+
+    groups = []
+    for i, name in enumerate(names):
+        values = sorted_grades[bounds[i]:bounds[i + 1]]
+        percentiles = np.percentile(values, PERCENTILES)
+        groups.append({
+            'name': str(name),
+            'count': len(values),
+            'mean': round(float(values.mean()), 2),
+            'min': round(float(values[0]), 2),
+            'max': round(float(values[-1]), 2),
+            'percentiles': {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, percentiles)},
+            'risk': {
+                'LOW': int(low[i]),
+                'MEDIUM': len(values) - int(low[i]) - int(high[i]),
+                'HIGH': int(high[i]),
+            },
+        })
+    return groups
+
+
+def as_chart(groups):
+    """Shape grouped stats as apexcharts categories and series"""
+    return {
+        'categories': [group['name'] for group in groups],
+        'series': [
+            {'name': 'Mean', 'data': [group['mean'] for group in groups]},
+            {'name': 'Median', 'data': [group['percentiles']['p50'] for group in groups]},
+            {'name': 'High Risk', 'data': [group['risk']['HIGH'] for group in groups]},
+        ],
+    }
@@ -0,0 +1,38 @@
+import time
+
+
+def evaluate_candidate(params, X, y, folds):
+    """K-fold CV error, plus size and single-row latency of the compact forest.
+
+    Runs in a joblib worker process, which imports this module without
+    Django being set up, so it must stay free of Django imports. Each fit is
+    single-threaded so workers don't compete for cores.
+    """
+    import numpy as np
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_squared_error
+    from sklearn.model_selection import KFold
+    from .forest import CompactForest
+
+    errors = []
+    for train, test in KFold(n_splits=folds, shuffle=True, random_state=42).split(X):
+        model = RandomForestRegressor(random_state=42, n_jobs=1, **params)
+        model.fit(X[train], y[train])
+        errors.append(mean_squared_error(y[test], model.predict(X[test])))
+
+    model = RandomForestRegressor(random_state=42, n_jobs=1, **params).fit(X, y)
+    forest = CompactForest.from_sklearn(model)
+    row = X[:1]
+    timings = []
+    for _ in range(20):
+        started = time.perf_counter()
+        forest.predict(row)
+        timings.append(time.perf_counter() - started)
+
+    return {
+        'params': params,
+        'cv_mse': float(np.mean(errors)),
+        'cv_mse_std': float(np.std(errors)),
+        'latency_ms': min(timings) * 1000,
+        'size_bytes': forest.nbytes,
+    }
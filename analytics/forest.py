@@ -0,0 +1,115 @@
+import numpy as np
+
+from .model_cache import atomic_write
+
+# Rows of the packed node table. Thresholds and leaf values are float64 stored
+# bit-for-bit in the int64 table and read back through .view(), so the whole
+# forest lives in one contiguous, memory-mappable array.
+FEATURE, LEFT, RIGHT, THRESHOLD, VALUE = range(5)
+
+# Samples evaluated together; bounds the (rows x trees) working arrays
+BLOCK_SIZE = 4096
+
+
+class CompactForest:
+    """Array-backed evaluator for a trained RandomForestRegressor.
+
+    Every tree's nodes are flattened into one (5, n_nodes) int64 table with
+    child indices made absolute. The table is saved as a single .npy file and
+    loaded with mmap_mode='r', so all worker processes share one page-cached
+    copy and loading costs no unpickling.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.feature = table[FEATURE]
+        self.left = table[LEFT]
+        self.right = table[RIGHT]
+        self.threshold = table[THRESHOLD].view(np.float64)
+        self.value = table[VALUE].view(np.float64)
+
+        # Roots are the nodes no other node points at, in tree order
+        is_root = np.ones(table.shape[1], dtype=bool)
+        is_root[self.left[self.left >= 0]] = False
+        is_root[self.right[self.right >= 0]] = False
+        self.roots = np.flatnonzero(is_root)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return self.table.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a fitted sklearn forest (or single tree) regressor"""
+        estimators = getattr(model, 'estimators_', [model])
+        n_nodes = sum(estimator.tree_.node_count for estimator in estimators)
+        table = np.empty((5, n_nodes), dtype=np.int64)
+        threshold = table[THRESHOLD].view(np.float64)
+        value = table[VALUE].view(np.float64)
+
+        offset = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            end = offset + tree.node_count
+            left = tree.children_left.astype(np.int64)
+            right = tree.children_right.astype(np.int64)
+            table[FEATURE, offset:end] = tree.feature
+            table[LEFT, offset:end] = np.where(left >= 0, left + offset, -1)
+            table[RIGHT, offset:end] = np.where(right >= 0, right + offset, -1)
+            threshold[offset:end] = tree.threshold
+            value[offset:end] = tree.value[:, 0, 0]
+            offset = end
+
+        return cls(table)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        return cls(np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False))
+
+    def save(self, path):
+        """Atomically write the node table as a .npy file"""
+        atomic_write(path, lambda f: np.save(f, np.ascontiguousarray(self.table), allow_pickle=False))
+
+    def predict(self, X):
+        """Mean prediction of all trees for each row of X, like sklearn's predict"""
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), BLOCK_SIZE):
+            block = X[start:start + BLOCK_SIZE]
+            out[start:start + len(block)] = self._predict_block(block)
+        return out
+
+    def _predict_block(self, X):
+        n_trees = len(self.roots)
+        n_features = X.shape[1]
+        flat_X = X.ravel()
+        leaves = np.empty(len(X) * n_trees, dtype=np.int64)
+
+        # One entry per (row, tree) pair still walking down its tree; pairs
+        # drop out as soon as they reach a leaf, so work follows path length
+        position = np.arange(len(leaves))
+        node = np.tile(self.roots, len(X))
+        row_start = np.repeat(np.arange(len(X)) * n_features, n_trees)
+        while len(node):
+            left = self.left.take(node)
+            internal = left >= 0
+            done = ~internal
+            leaves[position[done]] = node[done]
+
+            position, node, row_start, left = position[internal], node[internal], row_start[internal], left[internal]
+            go_left = flat_X.take(row_start + self.feature.take(node)) <= self.threshold.take(node)
+            node = np.where(go_left, left, self.right.take(node))
+
+        return self.value.take(leaves).reshape(len(X), n_trees).mean(axis=1)
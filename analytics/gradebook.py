@@ -0,0 +1,103 @@
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from student.importers import ImportResult, iter_rows
+from student.models import Student
+from .models import StudentGrade, MLModel, FEATURE_FIELDS
+from .scoring import rescore_students
+from . import cohort_stats
+
+# One row per student; the subject (and optionally the class) is chosen on the form
+GRADEBOOK_COLUMNS = ('student_id',) + FEATURE_FIELDS
+
+DEFAULT_CHUNK_SIZE = 500
+
+MAX_SCORE = 100
+
+
+def _clean_scores(row):
+    scores = []
+    errors = []
+    for name in FEATURE_FIELDS:
+        raw = row.get(name)
+        if isinstance(raw, str):
+            raw = raw.strip()
+        try:
+            value = StudentGrade._meta.get_field(name).clean(raw, None)
+        except ValidationError as e:
+            errors.append(f"{name}: {' '.join(e.messages)}")
+            continue
+        if not 0 <= value <= MAX_SCORE:
+            errors.append(f"{name}: must be between 0 and {MAX_SCORE}")
+        scores.append(value)
+    return scores, errors
+
+
+def _import_chunk(rows, subject, students, seen_ids, result):
+    student_ids = [str(row.get('student_id') or '').strip() for _, row in rows]
+    # One lookup resolves every student on the sheet
+    pks = dict(students.filter(student_id__in=student_ids).values_list('student_id', 'pk'))
+
+    valid = []
+    for (row_number, row), student_id in zip(rows, student_ids):
+        scores, errors = _clean_scores(row)
+        if not student_id:
+            errors.append("student_id: This field cannot be blank.")
+        elif student_id not in pks:
+            errors.append(f"student_id: {student_id} not found")
+        elif student_id in seen_ids:
+            errors.append(f"student_id: {student_id} appears more than once in the file")
+        if errors:
+            result.add_error(row_number, '; '.join(errors))
+            continue
+        seen_ids.add(student_id)
+        valid.append((pks[student_id], scores))
+    if not valid:
+        return
+
+    # The whole sheet is scored in a single model call
+    predictions, _, _ = MLModel.predict_performance_batch([scores for _, scores in valid])
+    grades = [
+        StudentGrade(student_id=pk, subject=subject, final_grade=prediction, **dict(zip(FEATURE_FIELDS, scores)))
+        for (pk, scores), prediction in zip(valid, predictions.tolist())
+    ]
+    with transaction.atomic():
+        StudentGrade.objects.bulk_create(
+            grades,
+            update_conflicts=True,
+            unique_fields=['student', 'subject'],
+            update_fields=[*FEATURE_FIELDS, 'final_grade', 'updated_at'],
+        )
+        rescore_students([pk for pk, _ in valid])
+        # bulk_create sends no post_save, which normally refreshes the stats
+        transaction.on_commit(cohort_stats.invalidate)
+    result.created += len(grades)
+
+
+def import_gradebook(uploaded_file, subject, student_class=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Upsert one subject's grades for a whole class from a CSV/XLSX sheet.
+
+    Each chunk of rows costs one student lookup, one batched prediction, one
+    INSERT ... ON CONFLICT for the grades and a bulk rescore of the
+    students' analytics. ``student_class`` restricts the sheet to one class.
+    Returns an ImportResult whose ``created`` counts grades saved, new or
+    updated; raises ValueError for an unsupported file type or missing
+    columns.
+    """
+    result = ImportResult()
+    seen_ids = set()
+    students = Student.objects.all()
+    if student_class:
+        students = students.filter(student_class=student_class)
+    rows = iter_rows(uploaded_file)
+    chunk = list(islice(rows, chunk_size))
+    if chunk:
+        missing = [column for column in GRADEBOOK_COLUMNS if column not in chunk[0][1]]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+    while chunk:
+        _import_chunk(chunk, subject, students, seen_ids, result)
+        chunk = list(islice(rows, chunk_size))
+    return result
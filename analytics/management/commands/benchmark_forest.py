@@ -0,0 +1,87 @@
+import os
+import pickle
+import resource
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.forest import CompactForest
+from analytics.models import MODEL_PATH, FOREST_PATH, FEATURE_FIELDS
+
+
+def current_rss():
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # No procfs: fall back to the peak RSS (KiB on Linux)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+class Command(BaseCommand):
+    help = "Compare the pickled sklearn forest with the memory-mapped compact evaluator"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help="Rows in the batch benchmark")
+        parser.add_argument('--repeat', type=int, default=5, help="Timing repetitions (best is reported)")
+
+    def handle(self, *args, **options):
+        if not os.path.exists(MODEL_PATH):
+            raise CommandError(f"No trained model at {MODEL_PATH}; retrain it first.")
+
+        rng = np.random.default_rng(0)
+        X = rng.uniform(0, 100, size=(options['rows'], len(FEATURE_FIELDS)))
+        repeat = options['repeat']
+
+        rss_before = current_rss()
+        started = time.perf_counter()
+        with open(MODEL_PATH, 'rb') as f:
+            sk_model = pickle.load(f)
+        sk_load = time.perf_counter() - started
+        sk_rss = current_rss() - rss_before
+
+        if not os.path.exists(FOREST_PATH):
+            CompactForest.from_sklearn(sk_model).save(FOREST_PATH)
+        rss_before = current_rss()
+        started = time.perf_counter()
+        forest = CompactForest.load(FOREST_PATH)
+        forest_load = time.perf_counter() - started
+        forest_rss = current_rss() - rss_before
+
+        sk_pred = sk_model.predict(X)
+        forest_pred = forest.predict(X)
+        max_diff = float(np.max(np.abs(sk_pred - forest_pred))) if len(X) else 0.0
+
+        single = X[:1]
+        results = [
+            ('load', sk_load, forest_load),
+            ('predict 1 row', best_of(repeat, lambda: sk_model.predict(single)),
+             best_of(repeat, lambda: forest.predict(single))),
+            (f'predict {len(X)} rows', best_of(repeat, lambda: sk_model.predict(X)),
+             best_of(repeat, lambda: forest.predict(X))),
+        ]
+
+        self.stdout.write(f"Trees: {forest.n_trees}, nodes: {forest.n_nodes}")
+        self.stdout.write(f"{'':<22}{'sklearn':>14}{'compact':>14}")
+        for label, sk_time, forest_time in results:
+            self.stdout.write(f"{label:<22}{sk_time * 1000:>12.3f}ms{forest_time * 1000:>12.3f}ms")
+        self.stdout.write(
+            f"{'file size':<22}{os.path.getsize(MODEL_PATH) / 1024:>12.1f}KB"
+            f"{os.path.getsize(FOREST_PATH) / 1024:>12.1f}KB"
+        )
+        self.stdout.write(f"{'RSS after load':<22}{sk_rss / 1024:>12.1f}KB{forest_rss / 1024:>12.1f}KB")
+
+        if max_diff > 1e-9:
+            raise CommandError(f"Predictions differ from sklearn by up to {max_diff:.3g}")
+        self.stdout.write(self.style.SUCCESS(f"Predictions match sklearn (max abs diff {max_diff:.3g})"))
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+SETUP_SNIPPET = "import django; django.setup()"
+
+# Heavy packages that no process should pay for just by booting Django
+DEFAULT_FORBIDDEN = ('numpy', 'sklearn', 'scipy', 'pandas')
+
+
+def parse_importtime(stderr):
+    """Parse ``python -X importtime`` output into (module, self_us, cumulative_us, depth) rows"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Report python -X importtime totals for django.setup() and flag heavy imports"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to list")
+        parser.add_argument('--max-ms', type=float, help="Fail if total import time exceeds this")
+        parser.add_argument(
+            '--forbid', nargs='*', default=list(DEFAULT_FORBIDDEN),
+            help="Top-level packages that must not be imported during setup"
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, PYTHONWARNINGS='ignore')
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SETUP_SNIPPET],
+            env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f"django.setup() failed:\n{result.stderr[-2000:]}")
+
+        rows = parse_importtime(result.stderr)
+        total_ms = sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000
+        self.stdout.write(f"django.setup() imports: {len(rows)} modules, {total_ms:.1f}ms total")
+
+        self.stdout.write(f"Slowest {options['top']} (cumulative):")
+        for name, _, cumulative, _ in sorted(rows, key=lambda row: row[2], reverse=True)[:options['top']]:
+            self.stdout.write(f"  {cumulative / 1000:>9.1f}ms  {name}")
+
+        loaded = {name.split('.')[0] for name, _, _, _ in rows}
+        forbidden = sorted(loaded.intersection(options['forbid']))
+        if forbidden:
+            raise CommandError(f"Heavy packages imported at startup: {', '.join(forbidden)}")
+        if options['max_ms'] is not None and total_ms > options['max_ms']:
+            raise CommandError(f"Startup imports took {total_ms:.1f}ms (budget {options['max_ms']:.1f}ms)")
+        self.stdout.write(self.style.SUCCESS("Startup import check passed"))
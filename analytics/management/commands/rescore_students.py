@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.scoring import rescore_students, rescore_changed_students, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Recompute PerformanceAnalytics using batched ML predictions (all students, or only changed ones)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help="Number of students scored per query/prediction/bulk write"
+        )
+        parser.add_argument(
+            '--changed', action='store_true',
+            help="Only rescore students whose grades changed since the last --changed run"
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['changed']:
+            considered, created, updated = rescore_changed_students(chunk_size=options['chunk_size'])
+            self.stdout.write(f"{considered} students had grade changes")
+        else:
+            created, updated = rescore_students(chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored students: {created} analytics created, "
+            f"{updated} updated in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.tuning import tune_grade_model, DEFAULT_TOLERANCE
+
+
+class Command(BaseCommand):
+    help = "Cross-validate a grid of forest sizes/depths in parallel and save the smallest accurate one"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--folds', type=int, default=5, help="Cross-validation folds")
+        parser.add_argument('--jobs', type=int, help="Worker processes (default: all cores)")
+        parser.add_argument('--max-latency-ms', type=float, help="Single-row prediction budget")
+        parser.add_argument('--max-size-kb', type=float, help="Compact model size budget")
+        parser.add_argument(
+            '--tolerance', type=float, default=DEFAULT_TOLERANCE,
+            help="Accept candidates whose CV MSE is within this fraction of the best"
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Report only; keep the current model")
+
+    def handle(self, *args, **options):
+        max_size = options['max_size_kb'] * 1024 if options['max_size_kb'] is not None else None
+        started = time.perf_counter()
+        results, best = tune_grade_model(
+            folds=options['folds'],
+            n_jobs=options['jobs'],
+            max_latency_ms=options['max_latency_ms'],
+            max_size_bytes=max_size,
+            tolerance=options['tolerance'],
+            save=not options['dry_run'],
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"{'trees':>6}{'depth':>7}{'leaf':>6}{'cv mse':>10}{'latency':>11}{'size':>11}")
+        for result in sorted(results, key=lambda result: result['cv_mse']):
+            params = result['params']
+            marker = ' *' if result is best else ''
+            self.stdout.write(
+                f"{params['n_estimators']:>6}{str(params['max_depth']):>7}{params['min_samples_leaf']:>6}"
+                f"{result['cv_mse']:>10.2f}{result['latency_ms']:>9.3f}ms"
+                f"{result['size_bytes'] / 1024:>9.1f}KB{marker}"
+            )
+        self.stdout.write(f"Evaluated {len(results)} candidates in {elapsed:.1f}s")
+
+        if best is None:
+            raise CommandError("No candidate fits the latency/size budget")
+        action = "Selected" if options['dry_run'] else "Saved"
+        self.stdout.write(self.style.SUCCESS(f"{action} {best['params']} (CV MSE {best['cv_mse']:.2f})"))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_studentgrade_updated_at_analyticswatermark'),
+        ('student', '0003_remove_student_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='performanceanalytics',
+            index=models.Index(fields=['created_at', 'id'], name='analytics_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='performanceanalytics',
+            index=models.Index(fields=['risk_level', 'created_at', 'id'], name='analytics_risk_created_idx'),
+        ),
+    ]
@@ -0,0 +1,95 @@
+import os
+import pickle
+import tempfile
+import threading
+
+
+def atomic_write(path, writer):
+    """Write a file via ``writer(fileobj)`` to a temp file, then rename it over path.
+
+    Readers see either the old file or the complete new one, never a partial
+    write; the rename also gives the file a new inode for ModelCache to notice.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            writer(f)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file owner-only; models must stay readable by every worker
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelCache:
+    """Per-process holder for the trained grade model.
+
+    The model is loaded from disk once and reused for every prediction.
+    Each lookup stats the model file; when its stamp (inode, size, mtime)
+    changes the file is loaded again and swapped in as a whole, so readers
+    never see a partially loaded model.
+    """
+
+    def __init__(self, path, loader=None):
+        self.path = path
+        self.loader = loader or self._unpickle
+        self._lock = threading.Lock()
+        self._entry = None  # (stamp, model)
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    @staticmethod
+    def _unpickle(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def _stamp(self):
+        st = os.stat(self.path)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def get(self):
+        """Return the cached model, loading or reloading it if the file changed.
+
+        Raises FileNotFoundError when there is no model file on disk.
+        """
+        stamp = self._stamp()
+        entry = self._entry
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            # Another thread may have loaded it while we waited for the lock
+            entry = self._entry
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return entry[1]
+
+            model = self.loader(self.path)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+            self._entry = (stamp, model)
+            return model
+
+    def invalidate(self):
+        """Drop the cached model so the next lookup reads it from disk"""
+        with self._lock:
+            self._entry = None
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'loaded': self._entry is not None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+        }
@@ -1,12 +1,50 @@
 from django.db import models
 from student.models import Student
 from subject.models import Subject
-import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error
 import pickle
 import os
+from itertools import islice
+from django.conf import settings
+from .model_cache import ModelCache, atomic_write
+
+# numpy and scikit-learn are imported inside the MLModel methods that need
+# them: this module is loaded by every process at django.setup(), and most of
+# them (logins, student CRUD, manage.py commands) never touch the model.
+
+MODEL_PATH = getattr(
+    settings, 'ANALYTICS_MODEL_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ml_model.pkl')
+)
+
+# Flattened copy of the pickled forest that inference actually uses; it is
+# memory-mapped, so all worker processes share one page-cached copy
+FOREST_PATH = os.path.splitext(MODEL_PATH)[0] + '.forest.npy'
+
+def _load_forest(path):
+    from .forest import CompactForest
+    return CompactForest.load(path)
+
+# Shared by every request served from this process
+model_cache = ModelCache(FOREST_PATH, loader=_load_forest)
+
+# Model inputs, in the column order the forest was trained on
+FEATURE_FIELDS = ('assignment_score', 'exam_score', 'attendance_percentage', 'participation_score')
+# Weight of each feature in a final grade, in FEATURE_FIELDS order
+GRADE_WEIGHTS = (0.3, 0.4, 0.2, 0.1)
+
+LOW_RISK_THRESHOLD = 80
+MEDIUM_RISK_THRESHOLD = 65
+
+# Cap on historical grades used for training; the newest rows are kept
+TRAINING_MAX_ROWS = getattr(settings, 'ANALYTICS_TRAINING_MAX_ROWS', 200000)
+# Below this many real grades the model is trained on synthetic data instead
+TRAINING_MIN_ROWS = getattr(settings, 'ANALYTICS_TRAINING_MIN_ROWS', 50)
+
+RECOMMENDATIONS = {
+    'LOW': "Excellent performance! Keep up the good work.",
+    'MEDIUM': "Good performance. Focus on improving weaker areas.",
+    'HIGH': "Needs attention. Consider additional tutoring and study support.",
+}
 
 class StudentGrade(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
@@ -17,6 +55,8 @@ class StudentGrade(models.Model):
     participation_score = models.FloatField(default=0)
     final_grade = models.FloatField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Indexed so incremental rescoring can find recently changed grades
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         unique_together = ('student', 'subject')
@@ -35,13 +75,68 @@ class PerformanceAnalytics(models.Model):
     recommendations = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        # Keyset pagination of the dashboard, with and without the risk filter
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='analytics_created_idx'),
+            models.Index(fields=['risk_level', 'created_at', 'id'], name='analytics_risk_created_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.student.first_name} - Risk: {self.risk_level}"
 
+class AnalyticsWatermark(models.Model):
+    """High-water mark of the last completed incremental job, by job name"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+class ModelTrainingJob(models.Model):
+    """Status of a background model retraining run"""
+    QUEUED = 'QUEUED'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+    ACTIVE_STATUSES = (QUEUED, RUNNING)
+    
+    model_name = models.CharField(max_length=50, default='grade_model')
+    status = models.CharField(max_length=10, choices=[
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed')
+    ], default=QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0)
+    mse = models.FloatField(null=True, blank=True)
+    duration = models.FloatField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # At most one queued/running job per model, across all workers
+            models.UniqueConstraint(
+                fields=['model_name'],
+                condition=models.Q(status__in=['QUEUED', 'RUNNING']),
+                name='single_active_training_job'
+            )
+        ]
+    
+    def __str__(self):
+        return f"{self.model_name} #{self.pk}: {self.status}"
+
 class MLModel:
     @staticmethod
     def generate_sample_data():
         """Generate sample student performance data for ML training"""
+        import numpy as np
+        
         np.random.seed(42)
         n_samples = 100
         
@@ -60,26 +155,73 @@ class MLModel:
         data['participation'] = np.clip(data['participation'], 0, 100)
         
         # Calculate final grades with realistic weights
-        final_grades = (
-            0.3 * data['assignment_scores'] + 
-            0.4 * data['exam_scores'] + 
-            0.2 * data['attendance'] + 
-            0.1 * data['participation']
-        )
-        
         X = np.column_stack([
             data['assignment_scores'],
             data['exam_scores'], 
             data['attendance'],
             data['participation']
         ])
+        final_grades = X @ np.array(GRADE_WEIGHTS)
         
         return X, final_grades
     
     @staticmethod
-    def train_and_save_model():
-        """Train a Random Forest model for grade prediction"""
-        X, y = MLModel.generate_sample_data()
+    def load_training_data(max_rows=None, chunk_size=2000):
+        """Stream StudentGrade features and their weighted grades into float32 arrays.
+
+        The target is computed from the recorded scores with GRADE_WEIGHTS,
+        not read from ``final_grade``: that column holds the model's own
+        prediction, and retraining on it would only fit the forest to its
+        previous output. Rows are read with values_list().iterator() straight
+        into a preallocated matrix, so no model instances are built and memory
+        is bounded by ``max_rows`` (the newest grades win when the table is larger).
+        """
+        import numpy as np
+        
+        if max_rows is None:
+            max_rows = TRAINING_MAX_ROWS
+        queryset = StudentGrade.objects.order_by('-pk')
+        n_rows = min(queryset.count(), max_rows)
+        
+        X = np.empty((n_rows, len(FEATURE_FIELDS)), dtype=np.float32)
+        rows = queryset.values_list(*FEATURE_FIELDS)[:n_rows].iterator(chunk_size=chunk_size)
+        
+        filled = 0
+        while filled < n_rows:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            X[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+        
+        # Rows deleted between count() and the scan leave the tail unfilled
+        X = X[:filled]
+        return X, X @ np.array(GRADE_WEIGHTS, dtype=np.float32)
+    
+    @staticmethod
+    def training_data():
+        """Recorded grades, or synthetic data while there are too few of them"""
+        X, y = MLModel.load_training_data()
+        if len(y) < TRAINING_MIN_ROWS:
+            X, y = MLModel.generate_sample_data()
+        return X, y
+    
+    @staticmethod
+    def train_and_save_model(progress=None):
+        """Train a Random Forest model for grade prediction
+
+        Trains on the scores of recorded StudentGrade rows, falling back to
+        synthetic data while there are fewer than TRAINING_MIN_ROWS of them.
+        ``progress`` is an optional callable receiving a completion percentage.
+        """
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import mean_squared_error
+        
+        report = progress or (lambda percent: None)
+        
+        X, y = MLModel.training_data()
+        report(10)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -87,42 +229,113 @@ class MLModel:
         # Train model (Random Forest from scikit-learn - common in educational analytics)
         model = RandomForestRegressor(n_estimators=100, random_state=42)
         model.fit(X_train, y_train)
+        report(70)
         
         # Evaluate
         y_pred = model.predict(X_test)
         mse = mean_squared_error(y_test, y_pred)
+        report(80)
         
-        # Save model
-        model_path = os.path.join('analytics', 'ml_model.pkl')
-        os.makedirs(os.path.dirname(model_path), exist_ok=True)
-        with open(model_path, 'wb') as f:
-            pickle.dump(model, f)
+        MLModel.save_model(model)
+        report(100)
             
         return model, mse
     
     @staticmethod
-    def predict_performance(assignment_score, exam_score, attendance, participation):
-        """Predict student performance using trained model"""
-        model_path = os.path.join('analytics', 'ml_model.pkl')
+    def save_model(model):
+        """Atomically replace the pickled model and its compact inference copy"""
+        from .forest import CompactForest
         
-        if not os.path.exists(model_path):
+        atomic_write(MODEL_PATH, lambda f: pickle.dump(model, f))
+        CompactForest.from_sklearn(model).save(FOREST_PATH)
+        model_cache.invalidate()
+    
+    @staticmethod
+    def warm_up():
+        """Import the ML stack and map the model ahead of the first request"""
+        import numpy
+        import sklearn.ensemble
+        
+        try:
+            model_cache.get()
+        except FileNotFoundError:
+            # Nothing trained yet; the first prediction will train it
+            pass
+    
+    @staticmethod
+    def get_model():
+        """Return the process-wide cached inference model, training one if none exists"""
+        try:
+            return model_cache.get()
+        except FileNotFoundError:
+            pass
+        
+        if os.path.exists(MODEL_PATH):
+            # Pickled model from before the compact format: export it once
+            from .forest import CompactForest
+            with open(MODEL_PATH, 'rb') as f:
+                CompactForest.from_sklearn(pickle.load(f)).save(FOREST_PATH)
+        else:
             MLModel.train_and_save_model()
+        return model_cache.get()
+    
+    @staticmethod
+    def predict_performance(assignment_score, exam_score, attendance, participation):
+        """Predict student performance using trained model"""
+        import numpy as np
         
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
+        model = MLModel.get_model()
         
         features = np.array([[assignment_score, exam_score, attendance, participation]])
         prediction = model.predict(features)[0]
         
         # Determine risk level
-        if prediction >= 80:
+        if prediction >= LOW_RISK_THRESHOLD:
             risk_level = 'LOW'
-            recommendations = "Excellent performance! Keep up the good work."
-        elif prediction >= 65:
+        elif prediction >= MEDIUM_RISK_THRESHOLD:
             risk_level = 'MEDIUM' 
-            recommendations = "Good performance. Focus on improving weaker areas."
         else:
             risk_level = 'HIGH'
-            recommendations = "Needs attention. Consider additional tutoring and study support."
+        recommendations = RECOMMENDATIONS[risk_level]
             
-        return prediction, risk_level, recommendations
\ No newline at end of file
+        return prediction, risk_level, recommendations
+    
+    @staticmethod
+    def classify_risk(predictions):
+        """Vectorized risk levels and recommendations for an array of predicted grades"""
+        import numpy as np
+        
+        predictions = np.asarray(predictions, dtype=float)
+        risk_levels = np.select(
+            [predictions >= LOW_RISK_THRESHOLD, predictions >= MEDIUM_RISK_THRESHOLD],
+            ['LOW', 'MEDIUM'],
+            default='HIGH'
+        )
+        recommendations = np.select(
+            [risk_levels == 'LOW', risk_levels == 'MEDIUM'],
+            [RECOMMENDATIONS['LOW'], RECOMMENDATIONS['MEDIUM']],
+            default=RECOMMENDATIONS['HIGH']
+        )
+        return risk_levels, recommendations
+    
+    @staticmethod
+    def predict_performance_batch(data):
+        """Predict many rows with a single model call.
+
+        ``data`` is an (N, 4) array-like ordered as FEATURE_FIELDS, or a
+        StudentGrade queryset. Returns (predictions, risk_levels,
+        recommendations) as arrays of length N.
+        """
+        import numpy as np
+        
+        if isinstance(data, models.QuerySet):
+            data = list(data.values_list(*FEATURE_FIELDS))
+        features = np.asarray(data, dtype=float).reshape(-1, len(FEATURE_FIELDS))
+        
+        if len(features) == 0:
+            predictions = np.empty(0)
+        else:
+            predictions = MLModel.get_model().predict(features)
+        
+        risk_levels, recommendations = MLModel.classify_risk(predictions)
+        return predictions, risk_levels, recommendations
\ No newline at end of file
@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from student.models import Student
+from .models import StudentGrade, PerformanceAnalytics, AnalyticsWatermark, MLModel, FEATURE_FIELDS
+
+DEFAULT_CHUNK_SIZE = 500
+
+RESCORE_WATERMARK = 'rescore_students'
+# Re-read a little before the last watermark so grades saved by transactions
+# that committed after a run started are not skipped; rescoring is idempotent
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def _student_id_chunks(student_ids, chunk_size):
+    """Yield sorted lists of student primary keys, chunk_size at a time"""
+    if student_ids is not None:
+        student_ids = sorted(set(student_ids))
+        for start in range(0, len(student_ids), chunk_size):
+            yield student_ids[start:start + chunk_size]
+        return
+
+    # Keyset walk over the primary key so every chunk is an index range scan
+    last_id = 0
+    while True:
+        chunk = list(
+            Student.objects.filter(pk__gt=last_id)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+def _rescore_chunk(student_ids):
+    import numpy as np
+
+    rows = list(
+        StudentGrade.objects.filter(student_id__in=student_ids)
+        .values_list('student_id', *FEATURE_FIELDS)
+    )
+    # Students whose last grade was deleted have nothing left to predict from
+    graded = {row[0] for row in rows}
+    PerformanceAnalytics.objects.filter(
+        student_id__in=[student_id for student_id in student_ids if student_id not in graded]
+    ).delete()
+    if not rows:
+        return 0, 0
+
+    owner_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    features = np.array([row[1:] for row in rows], dtype=float)
+    predictions, _, _ = MLModel.predict_performance_batch(features)
+
+    # A student's predicted GPA is the mean prediction over all of their grades
+    scored_ids, inverse = np.unique(owner_ids, return_inverse=True)
+    gpas = np.bincount(inverse, weights=predictions) / np.bincount(inverse)
+    risk_levels, recommendations = MLModel.classify_risk(gpas)
+
+    existing = {}
+    for analytics in (
+        PerformanceAnalytics.objects.filter(student_id__in=scored_ids.tolist())
+        .only('id', 'student_id', 'predicted_gpa', 'risk_level', 'recommendations')
+        .order_by('student_id', '-created_at')
+    ):
+        existing.setdefault(analytics.student_id, analytics)
+
+    to_update, to_create = [], []
+    for student_id, gpa, risk_level, recommendation in zip(
+        scored_ids.tolist(), gpas.tolist(), risk_levels.tolist(), recommendations.tolist()
+    ):
+        analytics = existing.get(student_id)
+        if analytics is None:
+            to_create.append(PerformanceAnalytics(
+                student_id=student_id,
+                predicted_gpa=gpa,
+                risk_level=risk_level,
+                recommendations=recommendation
+            ))
+        elif analytics.predicted_gpa != gpa or analytics.risk_level != risk_level:
+            analytics.predicted_gpa = gpa
+            analytics.risk_level = risk_level
+            analytics.recommendations = recommendation
+            to_update.append(analytics)
+
+    with transaction.atomic():
+        PerformanceAnalytics.objects.bulk_update(
+            to_update, ['predicted_gpa', 'risk_level', 'recommendations'], batch_size=100
+        )
+        PerformanceAnalytics.objects.bulk_create(to_create)
+
+    return len(to_create), len(to_update)
+
+
+def rescore_students(student_ids=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Recompute PerformanceAnalytics for the given students (default: everyone).
+
+    Students are processed chunk_size at a time: one grade query, one batched
+    prediction and one bulk write per chunk. Rows whose score did not change
+    are left alone. Returns (created, updated).
+    """
+    created = updated = 0
+    for chunk in _student_id_chunks(student_ids, chunk_size):
+        chunk_created, chunk_updated = _rescore_chunk(chunk)
+        created += chunk_created
+        updated += chunk_updated
+    return created, updated
+
+
+def rescore_changed_students(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Rescore only students whose grades changed since the last incremental run.
+
+    Deleting a grade leaves nothing to find by its updated_at, so the
+    StudentGrade post_delete signal touches the student's updated_at and
+    those students are rescored too. Returns (students_considered, created, updated).
+    """
+    run_started = timezone.now()
+    watermark, _ = AnalyticsWatermark.objects.get_or_create(name=RESCORE_WATERMARK)
+
+    grades = StudentGrade.objects.all()
+    students = Student.objects.all()
+    if watermark.value is not None:
+        since = watermark.value - WATERMARK_OVERLAP
+        grades = grades.filter(updated_at__gt=since)
+        students = students.filter(updated_at__gt=since)
+    student_ids = set(grades.order_by().values_list('student_id', flat=True).distinct())
+    student_ids.update(students.order_by().values_list('pk', flat=True))
+
+    created, updated = rescore_students(student_ids, chunk_size=chunk_size)
+
+    watermark.value = run_started
+    watermark.save(update_fields=['value'])
+    return len(student_ids), created, updated
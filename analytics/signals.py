@@ -0,0 +1,25 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from student.models import Student
+from .models import StudentGrade
+from . import cohort_stats
+
+
+@receiver([post_save, post_delete], sender=StudentGrade)
+def invalidate_stats_on_grade_change(sender, **kwargs):
+    cohort_stats.invalidate()
+
+
+@receiver(post_delete, sender=StudentGrade)
+def queue_rescore_on_grade_delete(sender, instance, **kwargs):
+    # A deleted grade leaves no updated_at behind, so mark the student as
+    # changed for the next incremental rescore instead
+    Student.objects.filter(pk=instance.student_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Student)
+def invalidate_stats_on_student_change(sender, **kwargs):
+    # A student's class or section may have changed, moving their grades
+    cohort_stats.invalidate()
@@ -1,3 +1,164 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from school.pagination import encode_cursor
+from student.models import Parent, Student
+from subject.models import Subject
+from . import training
+from .models import FEATURE_FIELDS, MLModel, ModelTrainingJob, PerformanceAnalytics, StudentGrade
+from .scoring import rescore_changed_students
+from .tuning import tune_grade_model
+
+
+def _student():
+    parent = Parent.objects.create(
+        father_name="John", father_mobile="5550100", father_email="john@example.com",
+        mother_name="Mary", mother_mobile="5550101", mother_email="mary@example.com",
+        present_address="1 School Road", permanent_address="1 School Road",
+    )
+    return Student.objects.create(
+        first_name="Sam", last_name="Lee", student_id="S000001", gender="Male",
+        date_of_birth=datetime.date(2010, 1, 1), student_class="5", religion="None",
+        joining_date=datetime.date(2020, 9, 1), mobile_number="5550102",
+        admission_number="ADM000001", section="A", student_email="sam@example.com", parent=parent,
+    )
+
+
+class TuneGradeModelTests(TestCase):
+    def test_parallel_grid_search(self):
+        # joblib's worker processes import the candidate evaluator without
+        # Django being set up
+        grid = {'n_estimators': [5, 10], 'max_depth': [4], 'min_samples_leaf': [1]}
+        results, best = tune_grade_model(grid=grid, folds=2, n_jobs=2, save=False)
+        self.assertEqual(len(results), 2)
+        self.assertIn(best['params'], [result['params'] for result in results])
+
+
+class DashboardPaginationTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='secret')
+        self.client.force_login(user)
+        student = _student()
+        PerformanceAnalytics.objects.bulk_create([
+            PerformanceAnalytics(student=student, predicted_gpa=n, risk_level='HIGH' if n % 3 else 'LOW')
+            for n in range(23)
+        ])
+        # Ties on created_at, so pages must split them by id
+        start = timezone.now()
+        for n, pk in enumerate(PerformanceAnalytics.objects.order_by('pk').values_list('pk', flat=True)):
+            PerformanceAnalytics.objects.filter(pk=pk).update(created_at=start - datetime.timedelta(minutes=n // 4))
+
+    def _pages(self, **params):
+        pages = []
+        cursor = None
+        while True:
+            query = {**params, **({'after': cursor} if cursor else {})}
+            page = self.client.get(reverse('analytics_dashboard'), query).context['page']
+            pages.append([row.pk for row in page])
+            if not page.has_next:
+                return pages, page
+            cursor = page.next_cursor
+
+    def test_pages_cover_every_row_once(self):
+        for params, rows in [
+            ({}, PerformanceAnalytics.objects.all()),
+            ({'risk': 'HIGH'}, PerformanceAnalytics.objects.filter(risk_level='HIGH')),
+        ]:
+            pages, _ = self._pages(per_page=5, **params)
+            expected = list(rows.order_by('-created_at', '-pk').values_list('pk', flat=True))
+            self.assertEqual(sum(pages, []), expected)
+            self.assertTrue(all(pages))
+
+    def test_previous_cursors_walk_back_over_the_same_pages(self):
+        pages, page = self._pages(per_page=5)
+        walked_back = [[row.pk for row in page]]
+        while page.has_previous:
+            page = self.client.get(
+                reverse('analytics_dashboard'), {'per_page': 5, 'before': page.previous_cursor}
+            ).context['page']
+            walked_back.insert(0, [row.pk for row in page])
+        self.assertEqual(walked_back, pages)
+
+    def test_bad_cursor_shows_the_first_page(self):
+        first = [row.pk for row in self.client.get(reverse('analytics_dashboard')).context['page']]
+        for cursor in ['garbage', encode_cursor('not-a-date', 1), encode_cursor(None, 1), encode_cursor([1], 'x')]:
+            for direction in ('after', 'before'):
+                response = self.client.get(reverse('analytics_dashboard'), {direction: cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([row.pk for row in response.context['page']], first)
+
+
+class RequestTrainingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='secret')
+
+    def test_joins_the_active_job(self):
+        job, created = training.request_training(self.user)
+        self.assertTrue(created)
+        self.assertEqual(training.request_training(self.user), (job, False))
+
+    def _failing_create(self, failures):
+        create = ModelTrainingJob.objects.create
+        calls = []
+
+        def failing_create(**kwargs):
+            calls.append(kwargs)
+            if len(calls) <= failures:
+                # Another request held the slot, and its job finished before we looked
+                raise IntegrityError("single_active_training_job")
+            return create(**kwargs)
+
+        return mock.patch.object(ModelTrainingJob.objects, 'create', failing_create), calls
+
+    def test_retries_when_the_conflicting_job_is_gone(self):
+        patch, calls = self._failing_create(failures=1)
+        with patch:
+            job, created = training.request_training(self.user)
+        self.assertTrue(created)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(job.status, ModelTrainingJob.QUEUED)
+
+    def test_gives_up_after_repeated_conflicts(self):
+        patch, calls = self._failing_create(failures=training.QUEUE_ATTEMPTS)
+        with patch, self.assertRaises(IntegrityError):
+            training.request_training(self.user)
+        self.assertEqual(len(calls), training.QUEUE_ATTEMPTS)
+        self.assertFalse(ModelTrainingJob.objects.exists())
+
+
+class RescoreChangedStudentsTests(TestCase):
+    def setUp(self):
+        self.student = _student()
+        for code, exam_score in [("MATH", 95), ("ART", 40)]:
+            StudentGrade.objects.create(
+                student=self.student, subject=Subject.objects.create(name=code, code=code),
+                assignment_score=80, exam_score=exam_score, attendance_percentage=90, participation_score=70,
+            )
+        rescore_changed_students()
+        # Nothing has changed since well before the last run
+        an_hour_ago = timezone.now() - datetime.timedelta(hours=1)
+        StudentGrade.objects.update(updated_at=an_hour_ago)
+        Student.objects.update(updated_at=an_hour_ago)
+
+    def test_unchanged_students_are_skipped(self):
+        self.assertEqual(rescore_changed_students(), (0, 0, 0))
+
+    def test_deleted_grade_rescores_the_student(self):
+        StudentGrade.objects.get(subject__code="ART").delete()
+        considered, created, updated = rescore_changed_students()
+        self.assertEqual((considered, created, updated), (1, 0, 1))
+        remaining = StudentGrade.objects.filter(student=self.student).values_list(*FEATURE_FIELDS)
+        predictions, _, _ = MLModel.predict_performance_batch(list(remaining))
+        analytics = PerformanceAnalytics.objects.get(student=self.student)
+        self.assertAlmostEqual(analytics.predicted_gpa, predictions.mean())
 
-# Create your tests here.
+    def test_deleting_every_grade_drops_the_prediction(self):
+        StudentGrade.objects.filter(student=self.student).delete()
+        self.assertEqual(rescore_changed_students()[0], 1)
+        self.assertFalse(PerformanceAnalytics.objects.filter(student=self.student).exists())
@@ -0,0 +1,93 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from school.notifications import notify
+from .models import ModelTrainingJob, MLModel
+
+# A job still queued/running after this long is assumed to belong to a dead worker
+STALE_JOB_TIMEOUT = timedelta(seconds=getattr(settings, 'ANALYTICS_TRAINING_TIMEOUT', 3600))
+
+# Times request_training tries to queue a job when it keeps losing races
+QUEUE_ATTEMPTS = 3
+
+
+def _expire_stale_jobs():
+    ModelTrainingJob.objects.filter(
+        status__in=ModelTrainingJob.ACTIVE_STATUSES,
+        created_at__lt=timezone.now() - STALE_JOB_TIMEOUT
+    ).update(
+        status=ModelTrainingJob.FAILED,
+        error="Abandoned: worker stopped before the job finished",
+        finished_at=timezone.now()
+    )
+
+
+def request_training(user):
+    """Queue a retraining run, or join the one already queued/running.
+
+    Returns (job, created). A new job is started on a background thread once
+    the surrounding transaction commits. Raises IntegrityError if no job could
+    be queued or joined after QUEUE_ATTEMPTS tries.
+    """
+    _expire_stale_jobs()
+    for attempt in range(1, QUEUE_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                job = ModelTrainingJob.objects.create(requested_by=user)
+        except IntegrityError:
+            # Lost the race to another request: coalesce onto its job
+            job = ModelTrainingJob.objects.filter(status__in=ModelTrainingJob.ACTIVE_STATUSES).first()
+            if job is not None:
+                return job, False
+            # That job already finished and freed the slot; try again
+            if attempt == QUEUE_ATTEMPTS:
+                raise
+            continue
+        transaction.on_commit(lambda: _start_thread(job.pk))
+        return job, True
+
+
+def _start_thread(job_id):
+    thread = threading.Thread(
+        target=run_training_job, args=(job_id,), name=f"train-model-{job_id}", daemon=True
+    )
+    thread.start()
+
+
+def run_training_job(job_id):
+    """Train the model for a queued job, recording progress and outcome on its row"""
+    jobs = ModelTrainingJob.objects.filter(pk=job_id)
+    started = time.perf_counter()
+    try:
+        jobs.update(status=ModelTrainingJob.RUNNING, started_at=timezone.now(), progress=0)
+        model, mse = MLModel.train_and_save_model(
+            progress=lambda percent: jobs.update(progress=percent)
+        )
+        jobs.update(
+            status=ModelTrainingJob.DONE,
+            mse=mse,
+            duration=time.perf_counter() - started,
+            finished_at=timezone.now(),
+            progress=100
+        )
+        job = jobs.first()
+        if job and job.requested_by_id:
+            notify(
+                user=job.requested_by_id,
+                message=f"ML Model retrained successfully. MSE: {mse:.2f}"
+            )
+    except Exception as e:
+        jobs.update(
+            status=ModelTrainingJob.FAILED,
+            error=str(e),
+            duration=time.perf_counter() - started,
+            finished_at=timezone.now()
+        )
+    finally:
+        # Background threads get their own connection; don't leak it
+        connection.close()
@@ -0,0 +1,58 @@
+import itertools
+import os
+
+from .evaluation import evaluate_candidate
+from .models import MLModel
+
+DEFAULT_GRID = {
+    'n_estimators': [10, 25, 50, 100],
+    'max_depth': [4, 6, 8, 12, None],
+    'min_samples_leaf': [1, 5, 20],
+}
+
+# Candidates whose CV error is within this fraction of the best feasible one
+# count as "accurate enough"; the smallest of those is chosen
+DEFAULT_TOLERANCE = 0.05
+
+
+def candidate_params(grid):
+    names = sorted(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def select_best(results, max_latency_ms=None, max_size_bytes=None, tolerance=DEFAULT_TOLERANCE):
+    """Smallest candidate within budget whose error is close to the best in budget"""
+    feasible = [
+        result for result in results
+        if (max_latency_ms is None or result['latency_ms'] <= max_latency_ms)
+        and (max_size_bytes is None or result['size_bytes'] <= max_size_bytes)
+    ]
+    if not feasible:
+        return None
+    best_mse = min(result['cv_mse'] for result in feasible)
+    good_enough = [result for result in feasible if result['cv_mse'] <= best_mse * (1 + tolerance)]
+    return min(good_enough, key=lambda result: (result['size_bytes'], result['latency_ms'], result['cv_mse']))
+
+
+def tune_grade_model(grid=None, folds=5, n_jobs=None, max_latency_ms=None, max_size_bytes=None,
+                     tolerance=DEFAULT_TOLERANCE, save=True):
+    """Grid-search forest size, depth and leaf size across all cores.
+
+    Returns (results, best). When ``save`` is set and a candidate fits the
+    budget, it is refit on all the data and saved as the live model.
+    """
+    from joblib import Parallel, delayed
+    from sklearn.ensemble import RandomForestRegressor
+
+    X, y = MLModel.training_data()
+    candidates = list(candidate_params(grid or DEFAULT_GRID))
+    results = Parallel(n_jobs=n_jobs or os.cpu_count() or 1)(
+        delayed(evaluate_candidate)(params, X, y, folds) for params in candidates
+    )
+
+    best = select_best(results, max_latency_ms, max_size_bytes, tolerance)
+    if best is not None and save:
+        model = RandomForestRegressor(random_state=42, **best['params']).fit(X, y)
+        MLModel.save_model(model)
+    return results, best
@@ -4,5 +4,9 @@ from . import views
 urlpatterns = [
     path("", views.analytics_dashboard, name="analytics_dashboard"),
     path("add-grade/", views.add_student_grade, name="add_student_grade"),
+    path("import-grades/", views.import_grades, name="import_grades"),
     path("train-model/", views.train_ml_model, name="train_ml_model"),
+    path("train-model/status/", views.training_status, name="training_status"),
+    path("stats/<str:grouping>/", views.cohort_statistics, name="cohort_stats"),
+    path("model-cache/", views.model_cache_stats, name="model_cache_stats"),
 ]
\ No newline at end of file
@@ -1,44 +1,61 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponse
-from .models import StudentGrade, PerformanceAnalytics, MLModel
+from django.db import IntegrityError
+from django.db.models import Count
+from django.http import JsonResponse, Http404
+from .models import StudentGrade, PerformanceAnalytics, MLModel, ModelTrainingJob, model_cache
+from .training import request_training
+from .gradebook import import_gradebook, GRADEBOOK_COLUMNS
+from . import cohort_stats
 from student.models import Student
 from subject.models import Subject
-from school.models import Notification
+from school.notifications import notify
+from school.pagination import keyset_paginate
+
+DASHBOARD_PAGE_SIZE = 20
+MAX_DASHBOARD_PAGE_SIZE = 100
 
 @login_required
 def analytics_dashboard(request):
-    """Main analytics dashboard"""
-    students = Student.objects.all()
-    subjects = Subject.objects.all()
-    recent_analytics = PerformanceAnalytics.objects.order_by('-created_at')[:10]
+    """Main analytics dashboard: keyset-paginated predictions, filterable by risk"""
+    risk_levels = [choice[0] for choice in PerformanceAnalytics._meta.get_field('risk_level').choices]
+    risk = request.GET.get('risk')
+    if risk not in risk_levels:
+        risk = None
+    try:
+        page_size = min(int(request.GET.get('per_page', DASHBOARD_PAGE_SIZE)), MAX_DASHBOARD_PAGE_SIZE)
+    except ValueError:
+        page_size = DASHBOARD_PAGE_SIZE
+    page_size = max(page_size, 1)
     
-    # Simple HTML response for now
-    html = f"""
-    <h1>🤖 ML Analytics Dashboard</h1>
-    <p><strong>Open-Source Integration:</strong> Random Forest from scikit-learn</p>
-    <p>Students: {students.count()} | Subjects: {subjects.count()}</p>
-    <p>Recent ML Predictions: {recent_analytics.count()}</p>
-    <hr>
-    <a href="/analytics/add-grade/" style="background:#007bff;color:white;padding:10px;text-decoration:none;border-radius:5px;">Add Grade & Run ML Prediction</a>
-    <a href="/analytics/train-model/" style="background:#28a745;color:white;padding:10px;text-decoration:none;border-radius:5px;margin-left:10px;">Retrain ML Model</a>
-    <a href="/dashboard/" style="background:#6c757d;color:white;padding:10px;text-decoration:none;border-radius:5px;margin-left:10px;">Back to Dashboard</a>
-    <hr>
-    """
+    analytics = PerformanceAnalytics.objects.select_related('student').only(
+        'predicted_gpa', 'risk_level', 'recommendations', 'created_at',
+        'student__first_name', 'student__last_name', 'student__student_id'
+    )
+    if risk:
+        analytics = analytics.filter(risk_level=risk)
+    page = keyset_paginate(
+        analytics, '-created_at',
+        after=request.GET.get('after'), before=request.GET.get('before'), page_size=page_size
+    )
     
-    for analytics in recent_analytics:
-        color = "red" if analytics.risk_level == 'HIGH' else "orange" if analytics.risk_level == 'MEDIUM' else "green"
-        html += f"""
-        <div style="border:1px solid {color}; padding:10px; margin:10px 0; border-radius:5px;">
-            <strong>{analytics.student.first_name} {analytics.student.last_name}</strong><br>
-            Predicted GPA: {analytics.predicted_gpa:.2f}<br>
-            Risk Level: {analytics.risk_level}<br>
-            Recommendations: {analytics.recommendations}
-        </div>
-        """
+    # One grouped query for all risk totals, regardless of the filter
+    risk_counts = dict.fromkeys(risk_levels, 0)
+    risk_counts.update(
+        PerformanceAnalytics.objects.order_by().values_list('risk_level').annotate(total=Count('id'))
+    )
     
-    return HttpResponse(html)
+    context = {
+        'page': page,
+        'risk': risk,
+        'risk_counts': risk_counts,
+        'page_size': page_size,
+        'student_count': Student.objects.count(),
+        'subject_count': Subject.objects.count(),
+        'training_job': ModelTrainingJob.objects.first(),
+    }
+    return render(request, "analytics/dashbord.html", context)
 
 @login_required
 def add_student_grade(request):
@@ -97,7 +114,7 @@ def add_student_grade(request):
             analytics.save()
         
         # Create notification
-        Notification.objects.create(
+        notify(
             user=request.user,
             message=f"ML Analysis completed for {student.first_name} {student.last_name}"
         )
@@ -105,135 +122,87 @@ def add_student_grade(request):
         messages.success(request, f"Grade added and ML prediction completed! Predicted Grade: {predicted_grade:.2f}")
         return redirect('analytics_dashboard')
     
-    students = Student.objects.all()
-    subjects = Subject.objects.all()
-    
+    # Student and subject are picked through the search autocomplete, so the
+    # form no longer lists every row of either table
+    return render(request, "analytics/add_grade.html")
+
+@login_required
+def import_grades(request):
+    """Upload a gradebook sheet: one subject's scores for a whole class"""
+    context = {'columns': GRADEBOOK_COLUMNS}
     if request.method == "POST":
-        # Form processing code stays the same
-        student_id = request.POST.get('student')
-        subject_id = request.POST.get('subject')
-        assignment_score = float(request.POST.get('assignment_score', 0))
-        exam_score = float(request.POST.get('exam_score', 0))
-        attendance = float(request.POST.get('attendance_percentage', 100))
-        participation = float(request.POST.get('participation_score', 0))
-        
-        student = get_object_or_404(Student, id=student_id)
-        subject = get_object_or_404(Subject, id=subject_id)
-        
-        # Calculate final grade using ML prediction
-        predicted_grade, risk_level, recommendations = MLModel.predict_performance(
-            assignment_score, exam_score, attendance, participation
-        )
-        
-        # Save grade
-        grade, created = StudentGrade.objects.get_or_create(
-            student=student,
-            subject=subject,
-            defaults={
-                'assignment_score': assignment_score,
-                'exam_score': exam_score,
-                'attendance_percentage': attendance,
-                'participation_score': participation,
-                'final_grade': predicted_grade
-            }
-        )
-        
-        if not created:
-            grade.assignment_score = assignment_score
-            grade.exam_score = exam_score
-            grade.attendance_percentage = attendance
-            grade.participation_score = participation
-            grade.final_grade = predicted_grade
-            grade.save()
-        
-        # Save analytics
-        analytics, created = PerformanceAnalytics.objects.get_or_create(
-            student=student,
-            defaults={
-                'predicted_gpa': predicted_grade,
-                'risk_level': risk_level,
-                'recommendations': recommendations
-            }
-        )
-        
-        if not created:
-            analytics.predicted_gpa = predicted_grade
-            analytics.risk_level = risk_level
-            analytics.recommendations = recommendations
-            analytics.save()
-        
-        # Create notification
-        Notification.objects.create(
-            user=request.user,
-            message=f"ML Analysis completed for {student.first_name} {student.last_name}"
-        )
-        
-        return HttpResponse(f"""
-        <h1>✅ ML Prediction Complete!</h1>
-        <p><strong>Student:</strong> {student.first_name} {student.last_name}</p>
-        <p><strong>Subject:</strong> {subject.name}</p>
-        <p><strong>Predicted Grade:</strong> {predicted_grade:.2f}</p>
-        <p><strong>Risk Level:</strong> {risk_level}</p>
-        <p><strong>Recommendations:</strong> {recommendations}</p>
-        <hr>
-        <a href="/analytics/" style="background:#007bff;color:white;padding:10px;text-decoration:none;border-radius:5px;">Back to Analytics Dashboard</a>
-        """)
-    
-    # Simple form HTML
-    form_html = f"""
-    <h1>🎯 Add Student Grade & ML Prediction</h1>
-    <form method="post">
-        <input type="hidden" name="csrfmiddlewaretoken" value="{request.META.get('CSRF_COOKIE', '')}">
-        
-        <p><label>Student:</label><br>
-        <select name="student" required>
-            <option value="">Choose student...</option>"""
-    
-    for student in students:
-        form_html += f'<option value="{student.id}">{student.first_name} {student.last_name}</option>'
-    
-    form_html += """</select></p>
-        
-        <p><label>Subject:</label><br>
-        <select name="subject" required>
-            <option value="">Choose subject...</option>"""
-    
-    for subject in subjects:
-        form_html += f'<option value="{subject.id}">{subject.name}</option>'
-    
-    form_html += """</select></p>
-        
-        <p><label>Assignment Score (0-100):</label><br>
-        <input type="number" name="assignment_score" min="0" max="100" step="0.1" required></p>
-        
-        <p><label>Exam Score (0-100):</label><br>
-        <input type="number" name="exam_score" min="0" max="100" step="0.1" required></p>
-        
-        <p><label>Attendance % (0-100):</label><br>
-        <input type="number" name="attendance_percentage" min="0" max="100" step="0.1" value="100" required></p>
-        
-        <p><label>Participation Score (0-100):</label><br>
-        <input type="number" name="participation_score" min="0" max="100" step="0.1" required></p>
-        
-        <button type="submit" style="background:#007bff;color:white;padding:10px;border:none;border-radius:5px;">🤖 Add Grade & Run ML Prediction</button>
-    </form>
-    <hr>
-    <a href="/analytics/" style="background:#6c757d;color:white;padding:10px;text-decoration:none;border-radius:5px;">Back to Analytics</a>
-    """
-    
-    return HttpResponse(form_html)
+        context['post'] = request.POST
+        upload = request.FILES.get('file')
+        subject_id = request.POST.get('subject', '')
+        subject = Subject.objects.filter(id=subject_id).first() if subject_id.isdigit() else None
+        student_class = request.POST.get('student_class', '').strip()
+        if subject is None or not upload:
+            messages.error(request, "Pick a subject and choose a CSV or XLSX file to import.")
+            return render(request, "analytics/import_grades.html", context)
+        try:
+            result = import_gradebook(upload, subject, student_class or None)
+        except ValueError as e:
+            messages.error(request, f"Error importing grades: {str(e)}")
+            return render(request, "analytics/import_grades.html", context)
+        
+        if result.created:
+            notify(
+                user=request.user,
+                message=f"Imported {result.created} {subject.name} grades from {upload.name}"
+            )
+        if result.failed:
+            messages.warning(request, f"Saved {result.created} grades; {result.failed} rows were rejected.")
+        else:
+            messages.success(request, f"Saved {result.created} grades and updated predictions.")
+        context['result'] = result
+    return render(request, "analytics/import_grades.html", context)
 
 @login_required
 def train_ml_model(request):
-    """Endpoint to retrain the ML model"""
+    """Endpoint to retrain the ML model in the background"""
     try:
-        model, mse = MLModel.train_and_save_model()
-        Notification.objects.create(
-            user=request.user,
-            message=f"ML Model retrained successfully. MSE: {mse:.2f}"
-        )
-        messages.success(request, f"ML Model trained successfully! Mean Squared Error: {mse:.2f}")
-    except Exception as e:
-        messages.error(request, f"Error training model: {str(e)}")
+        job, created = request_training(request.user)
+    except IntegrityError:
+        messages.error(request, "Could not start ML Model retraining. Please try again.")
+        return redirect('analytics_dashboard')
+    if created:
+        messages.success(request, f"ML Model retraining started (job #{job.pk}).")
+    else:
+        messages.info(request, f"ML Model retraining is already in progress (job #{job.pk}, {job.progress}% done).")
     
-    return redirect('analytics_dashboard')
\ No newline at end of file
+    return redirect('analytics_dashboard')
+
+@login_required
+def training_status(request):
+    """Status of the most recent model retraining job"""
+    job = ModelTrainingJob.objects.first()
+    if job is None:
+        return JsonResponse({'status': None})
+    return JsonResponse({
+        'id': job.pk,
+        'status': job.status,
+        'progress': job.progress,
+        'mse': job.mse,
+        'duration': job.duration,
+        'error': job.error,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+    })
+
+@login_required
+def model_cache_stats(request):
+    """Hit/miss/reload counters of this process's model cache"""
+    return JsonResponse(model_cache.stats())
+
+
+@login_required
+def cohort_statistics(request, grouping):
+    """Grade distribution per class, class/section or subject, with apexcharts series"""
+    if grouping not in cohort_stats.GROUPINGS:
+        raise Http404("Unknown grouping")
+    groups = cohort_stats.get_cohort_stats(grouping)
+    return JsonResponse({
+        'grouping': grouping,
+        'groups': groups,
+        'chart': cohort_stats.as_chart(groups),
+    })
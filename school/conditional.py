@@ -0,0 +1,37 @@
+from django.views.decorators.http import condition
+
+from . import notifications
+
+
+def conditional_page(state):
+    """Answer revalidation of a page from its rows' timestamps, before rendering it.
+
+    ``state(request, *args, **kwargs)`` returns ``(last_modified, key)``: the
+    newest updated_at among the rows the page shows and a string naming
+    them (e.g. a pk, or a row count so deletions change it), or None when
+    there is nothing to show. The pages greet the signed-in user and show
+    their notification bell, so the user's pk and notification state are
+    part of the ETag (anonymous visitors have neither); a matching
+    If-None-Match or If-Modified-Since gets a 304 without the view running.
+    """
+    def cached_state(request, *args, **kwargs):
+        if not hasattr(request, '_conditional_state'):
+            request._conditional_state = state(request, *args, **kwargs)
+        return request._conditional_state
+
+    def etag(request, *args, **kwargs):
+        current = cached_state(request, *args, **kwargs)
+        if current is None or current[0] is None:
+            return None
+        last_modified, key = current
+        if not request.user.is_authenticated:
+            return f"{key}-anonymous-{last_modified.timestamp():.6f}"
+        unread_count, cleared_at = notifications.notification_state(request.user)
+        cleared = f"{cleared_at.timestamp():.6f}" if cleared_at else "0"
+        return f"{key}-{request.user.pk}-{unread_count}-{cleared}-{last_modified.timestamp():.6f}"
+
+    def last_modified(request, *args, **kwargs):
+        current = cached_state(request, *args, **kwargs)
+        return current[0] if current is not None else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
@@ -0,0 +1,15 @@
+from . import notifications as notification_service
+
+
+def notifications(request):
+    """Unread count and latest unread notifications for the navbar bell"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    count, cleared_at = notification_service.notification_state(user)
+    return {
+        'unread_notification_count': count,
+        # Left unevaluated: pages that never render the dropdown don't query it
+        'unread_notification': notification_service.latest_unread(user, cleared_at) if count else [],
+        'notification_dropdown_size': notification_service.DROPDOWN_SIZE,
+    }
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+from django.conf import settings
+
+# Events a slow stream may fall behind by before further ones are dropped for it
+QUEUE_SIZE = getattr(settings, 'NOTIFICATION_STREAM_QUEUE_SIZE', 100)
+
+
+def as_event(notification):
+    """JSON-able payload the browser receives for a new notification"""
+    return {
+        'id': str(notification.pk),
+        'message': notification.message,
+        'created_at': notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+class NotificationHub:
+    """In-process fan-out of new notifications to each user's open streams.
+
+    Streams are asyncio queues living on the ASGI server's event loop;
+    publishers are ordinary threads (the notification flush), so events are
+    handed over with call_soon_threadsafe. An idle stream costs one queue
+    and one set entry. Only notifications written by this process are seen:
+    with several worker processes a stream receives the ones its own worker
+    flushed, and picks the rest up from the database when it reconnects.
+    """
+
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, user_id):
+        """New queue receiving the user's events; call from the event loop"""
+        queue = asyncio.Queue(self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self._lock:
+            streams = self._subscribers.get(user_id, set())
+            streams.difference_update({entry for entry in streams if entry[1] is queue})
+            if not streams:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, notifications):
+        """Send saved notifications to their users' streams; safe from any thread"""
+        with self._lock:
+            deliveries = [
+                (loop, queue, as_event(notification))
+                for notification in notifications
+                for loop, queue in self._subscribers.get(notification.user_id, ())
+            ]
+        for loop, queue, event in deliveries:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # The loop has shut down; its streams are gone with it
+                pass
+
+    def __len__(self):
+        return sum(len(streams) for streams in self._subscribers.values())
+
+
+def _offer(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # A stream this far behind catches up from the database on reconnect
+        pass
+
+
+hub = NotificationHub()
@@ -0,0 +1,104 @@
+import re
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+
+from student.models import Student
+from teacher.models import Teacher
+from .models import IdSequence
+
+DEFAULT_FORMATS = {
+    'student_id': 'S{:06d}',
+    'admission_number': 'ADM{:06d}',
+    'teacher_id': 'T{:04d}',
+}
+# str.format patterns with a single integer field, e.g. {'student_id': 'STU-{:05d}'}
+FORMATS = {**DEFAULT_FORMATS, **getattr(settings, 'ID_SEQUENCE_FORMATS', {})}
+
+# Numbers each process reserves at a time for one-off allocations. Numbers
+# still unused when a process exits are skipped, leaving gaps.
+BLOCK_SIZE = getattr(settings, 'ID_SEQUENCE_BLOCK_SIZE', 20)
+
+SEQUENCE_FIELDS = {
+    'student_id': (Student, 'student_id'),
+    'admission_number': (Student, 'admission_number'),
+    'teacher_id': (Teacher, 'teacher_id'),
+}
+
+_lock = threading.Lock()
+_blocks = {}
+
+
+def _highest_existing(name):
+    """Largest number already used by hand-typed IDs that match the format"""
+    prefix, rest = FORMATS[name].split('{', 1)
+    suffix = rest.split('}', 1)[1]
+    pattern = re.compile(re.escape(prefix) + r'(\d+)' + re.escape(suffix) + '$')
+    model, field = SEQUENCE_FIELDS[name]
+    highest = 0
+    for value in model.objects.filter(**{f'{field}__startswith': prefix}).values_list(field, flat=True).iterator():
+        match = pattern.match(value)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+
+def reserve(name, count):
+    """Reserve ``count`` consecutive numbers of a sequence; returns them as a range.
+
+    One UPDATE bumps the counter and locks the row until the transaction
+    ends, so concurrent callers always get disjoint ranges. The first use of
+    a sequence starts it after the highest matching ID already stored.
+    """
+    with transaction.atomic():
+        if not IdSequence.objects.filter(name=name).update(next_value=F('next_value') + count):
+            try:
+                with transaction.atomic():
+                    start = _highest_existing(name) + 1
+                    IdSequence.objects.create(name=name, next_value=start + count)
+                return range(start, start + count)
+            except IntegrityError:
+                # Another process created the sequence first
+                IdSequence.objects.filter(name=name).update(next_value=F('next_value') + count)
+        end = IdSequence.objects.filter(name=name).values_list('next_value', flat=True).get()
+    return range(end - count, end)
+
+
+def format_id(name, number):
+    return FORMATS[name].format(number)
+
+
+def _numbers(name, count):
+    # Small requests outside a transaction come from the per-process block;
+    # inside one they are reserved in it, so a rollback gives them back too
+    if count >= BLOCK_SIZE or connection.in_atomic_block:
+        return list(reserve(name, count))
+
+    numbers = []
+    with _lock:
+        while len(numbers) < count:
+            block = _blocks.get(name)
+            number = next(block, None) if block is not None else None
+            if number is None:
+                _blocks[name] = iter(reserve(name, BLOCK_SIZE))
+                continue
+            numbers.append(number)
+    return numbers
+
+
+def allocate(name, count=1):
+    """Hand out ``count`` new formatted IDs of a sequence.
+
+    Most numbers come from a per-process block, so allocating costs one
+    indexed lookup: IDs someone has since typed in by hand are skipped and
+    replaced with the next free numbers.
+    """
+    model, field = SEQUENCE_FIELDS[name]
+    ids = []
+    while len(ids) < count:
+        candidates = [format_id(name, number) for number in _numbers(name, count - len(ids))]
+        taken = set(model.objects.filter(**{f'{field}__in': candidates}).values_list(field, flat=True))
+        ids.extend(candidate for candidate in candidates if candidate not in taken)
+    return ids
@@ -0,0 +1,58 @@
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from school import media
+from school.storage import CONTENT_DIR, content_name, hash_file
+from school.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = ("Move student/teacher images into the content-addressed store, point records at the "
+            "deduplicated copies, recount references and delete unreferenced files")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report what would change; touch nothing")
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        started = time.perf_counter()
+        storage = default_storage
+
+        moved = {}
+        for model, field in media.IMAGE_FIELDS.items():
+            names = (
+                model.objects.exclude(**{field: ''}).exclude(**{f'{field}__startswith': f'{CONTENT_DIR}/'})
+                .values_list(field, flat=True).distinct()
+            )
+            for name in names:
+                if name not in moved:
+                    if not storage.exists(name):
+                        self.stderr.write(f"{name}: missing, left as is")
+                        continue
+                    with storage.open(name, 'rb') as content:
+                        target = content_name(hash_file(content), name)
+                        if not dry_run:
+                            # The content-addressed backend reuses an identical stored file
+                            target = storage.save(name, content)
+                    moved[name] = target
+                if not dry_run:
+                    model.objects.filter(**{field: name}).update(**{field: moved[name]})
+
+        self.stdout.write(f"{len(moved)} legacy files map to {len(set(moved.values()))} unique files")
+
+        if dry_run:
+            referenced = media.referenced_names()
+            referenced = {moved.get(name, name) for name in referenced}
+        else:
+            referenced = set(media.recount())
+            for name in set(moved.values()):
+                generate_thumbnails(name)
+        files, size = media.collect_garbage(referenced, dry_run=dry_run)
+
+        elapsed = time.perf_counter() - started
+        action = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {files} unreferenced files ({size / 1024:.1f} KB) in {elapsed:.2f}s"
+        ))
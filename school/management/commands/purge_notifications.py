@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from school.retention import purge_notifications, READ_RETENTION_DAYS, MAX_AGE_DAYS, PURGE_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Delete cleared, old read and expired notifications in short batched transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--read-days', type=int, default=READ_RETENTION_DAYS,
+            help="Delete read notifications older than this many days"
+        )
+        parser.add_argument(
+            '--max-age-days', type=int, default=MAX_AGE_DAYS,
+            help="Delete every notification older than this many days"
+        )
+        parser.add_argument('--keep-unread', action='store_true', help="Never delete unread notifications")
+        parser.add_argument('--batch-size', type=int, default=PURGE_BATCH_SIZE, help="Notifications deleted per transaction")
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        deleted = purge_notifications(
+            read_days=options['read_days'],
+            max_age_days=None if options['keep_unread'] else options['max_age_days'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted['cleared']} cleared, {deleted['read']} read and "
+            f"{deleted['expired']} expired notifications in {elapsed:.2f}s"
+        ))
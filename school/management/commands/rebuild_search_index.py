@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from school.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Re-create the student/teacher/subject search index from scratch"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = rebuild_index()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} documents in {elapsed:.2f}s"))
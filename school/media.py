@@ -0,0 +1,102 @@
+import os
+from collections import Counter
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+
+from student.models import Student
+from teacher.models import Teacher
+from .models import StoredFile
+from .storage import CONTENT_DIR, DERIVED_DIRNAME
+from . import thumbnails
+
+# Image fields whose files are reference counted
+IMAGE_FIELDS = {
+    Student: 'student_image',
+    Teacher: 'teacher_image',
+}
+
+
+def image_of(instance):
+    return getattr(instance, IMAGE_FIELDS[type(instance)])
+
+
+def acquire(name):
+    """Record one more reference to a stored file"""
+    StoredFile.objects.get_or_create(name=name)
+    StoredFile.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+
+def release(name):
+    """Drop one reference; delete the file and its thumbnails once nobody uses it"""
+    with transaction.atomic():
+        stored = StoredFile.objects.select_for_update().filter(name=name).first()
+        if stored is None:
+            return
+        if stored.refcount > 1:
+            StoredFile.objects.filter(pk=stored.pk).update(refcount=F('refcount') - 1)
+            return
+        stored.delete()
+        transaction.on_commit(lambda: _delete_file(name))
+
+
+def _delete_file(name):
+    # Re-check in case another record picked the same content up meanwhile
+    if not StoredFile.objects.filter(name=name, refcount__gt=0).exists():
+        default_storage.delete(name)
+        thumbnails.delete_thumbnails(name)
+
+
+def referenced_names():
+    """Count how many records use each file, straight from the image fields"""
+    counts = Counter()
+    for model, field in IMAGE_FIELDS.items():
+        counts.update(model.objects.exclude(**{field: ''}).values_list(field, flat=True))
+    return counts
+
+
+def recount():
+    """Rebuild StoredFile from the records; returns the reference counts"""
+    counts = referenced_names()
+    with transaction.atomic():
+        StoredFile.objects.all().delete()
+        StoredFile.objects.bulk_create(
+            [StoredFile(name=name, refcount=count) for name, count in counts.items()],
+            batch_size=500,
+        )
+    return counts
+
+
+def _walk(storage, path):
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield os.path.join(path, name)
+    for directory in directories:
+        if directory != DERIVED_DIRNAME:
+            yield from _walk(storage, os.path.join(path, directory))
+
+
+def media_directories():
+    """Content store plus each image field's legacy upload_to directory"""
+    directories = {CONTENT_DIR}
+    for model, field in IMAGE_FIELDS.items():
+        directories.add(model._meta.get_field(field).upload_to.strip('/'))
+    return sorted(directories)
+
+
+def collect_garbage(referenced, dry_run=False, storage=default_storage):
+    """Delete stored images no record references; returns (files, bytes) removed"""
+    files = size = 0
+    for directory in media_directories():
+        if not storage.exists(directory):
+            continue
+        for name in _walk(storage, directory):
+            if name in referenced:
+                continue
+            files += 1
+            size += storage.size(name)
+            if not dry_run:
+                storage.delete(name)
+                thumbnails.delete_thumbnails(name, storage)
+    return files, size
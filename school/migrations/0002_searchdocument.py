@@ -0,0 +1,85 @@
+from django.db import migrations, models
+
+FTS_TABLE = 'school_searchdocument_fts'
+
+# External-content FTS5 table kept in sync with school_searchdocument by
+# triggers, so bulk inserts and deletes are indexed too. kind is a column so
+# filtering by it is an index lookup; prefix='1 2 3' indexes the short
+# fragments autocomplete sends.
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        kind, text, content='school_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+    )""",
+    f"""CREATE TRIGGER school_searchdocument_ai AFTER INSERT ON school_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, kind, text) VALUES (new.id, new.kind, new.text);
+    END""",
+    f"""CREATE TRIGGER school_searchdocument_ad AFTER DELETE ON school_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, kind, text) VALUES ('delete', old.id, old.kind, old.text);
+    END""",
+    f"""CREATE TRIGGER school_searchdocument_au AFTER UPDATE ON school_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, kind, text) VALUES ('delete', old.id, old.kind, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, kind, text) VALUES (new.id, new.kind, new.text);
+    END""",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS school_searchdocument_au",
+    "DROP TRIGGER IF EXISTS school_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS school_searchdocument_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX school_searchdocument_text_trgm ON school_searchdocument USING gin (text gin_trgm_ops)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS school_searchdocument_text_trgm",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'sqlite':
+            with schema_editor.connection.cursor() as cursor:
+                cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+                if not cursor.fetchone()[0]:
+                    # search.py falls back to LIKE without the FTS table
+                    return
+            selected = statements['sqlite']
+        elif vendor == 'postgresql':
+            selected = statements['postgresql']
+        else:
+            return
+        for sql in selected:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('school', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('student', 'Student'), ('teacher', 'Teacher'), ('subject', 'Subject')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('label', models.CharField(max_length=255)),
+                ('key', models.CharField(max_length=255)),
+                ('text', models.TextField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document')],
+            },
+        ),
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
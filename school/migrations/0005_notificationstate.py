@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_unread(apps, schema_editor):
+    Notification = apps.get_model('school', 'Notification')
+    NotificationState = apps.get_model('school', 'NotificationState')
+    counts = (
+        Notification.objects.filter(is_read=False).order_by()
+        .values_list('user_id').annotate(total=Count('id'))
+    )
+    NotificationState.objects.bulk_create(
+        [NotificationState(user_id=user_id, unread_count=total) for user_id, total in counts],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('school', '0004_idsequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationState',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
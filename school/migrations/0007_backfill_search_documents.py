@@ -0,0 +1,73 @@
+from django.db import migrations
+
+CHUNK_SIZE = 1000
+
+
+def _normalize(*values):
+    # Same as school.search._normalize, which this migration must not import
+    return ' '.join(str(value) for value in values if value).lower()
+
+
+def _student_document(SearchDocument, student):
+    return SearchDocument(
+        kind='student',
+        object_id=student.pk,
+        label=f"{student.first_name} {student.last_name} ({student.student_id})",
+        key=student.student_id,
+        text=_normalize(student.first_name, student.last_name, student.student_id,
+                        student.admission_number, student.student_email),
+    )
+
+
+def _teacher_document(SearchDocument, teacher):
+    return SearchDocument(
+        kind='teacher',
+        object_id=teacher.pk,
+        label=f"{teacher.first_name} {teacher.last_name} ({teacher.teacher_id})",
+        key=teacher.slug,
+        text=_normalize(teacher.first_name, teacher.last_name, teacher.teacher_id,
+                        teacher.email, teacher.department),
+    )
+
+
+def _subject_document(SearchDocument, subject):
+    return SearchDocument(
+        kind='subject',
+        object_id=subject.pk,
+        label=f"{subject.name} ({subject.code})",
+        key=subject.code,
+        text=_normalize(subject.name, subject.code),
+    )
+
+
+def index_existing_rows(apps, schema_editor):
+    """Build search documents for the students, teachers and subjects saved before the index existed"""
+    SearchDocument = apps.get_model('school', 'SearchDocument')
+    builders = [
+        (apps.get_model('student', 'Student'), _student_document),
+        (apps.get_model('teacher', 'Teacher'), _teacher_document),
+        (apps.get_model('subject', 'Subject'), _subject_document),
+    ]
+    for model, build in builders:
+        chunk = []
+        for obj in model.objects.order_by('pk').iterator(chunk_size=CHUNK_SIZE):
+            chunk.append(build(SearchDocument, obj))
+            if len(chunk) == CHUNK_SIZE:
+                # Rows saved since the upgrade were indexed by the signals already
+                SearchDocument.objects.bulk_create(chunk, ignore_conflicts=True)
+                chunk = []
+        SearchDocument.objects.bulk_create(chunk, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('school', '0006_notification_retention'),
+        ('student', '0001_initial'),
+        ('teacher', '0001_initial'),
+        ('subject', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_existing_rows, migrations.RunPython.noop),
+    ]
@@ -2,14 +2,95 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.conf import settings
-import uuid
+from .uuids import uuid7
 
 class Notification(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Time-ordered, so inserts append to the primary key index
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     message = models.CharField(max_length=255)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # The navbar's latest unread items, and each user's batched clear
+            models.Index(fields=['user', 'is_read', 'created_at'], name='notification_user_unread_idx'),
+            # Retention purge of old (read) notifications
+            models.Index(fields=['is_read', 'created_at'], name='notification_retention_idx'),
+        ]
+
     def __str__(self):
         return self.message
+
+
+class SearchDocument(models.Model):
+    """One searchable student, teacher or subject.
+
+    ``text`` holds everything a user might type to find the record. On SQLite
+    it is mirrored into an FTS5 table by triggers; on PostgreSQL it carries a
+    trigram index. See school/search.py.
+    """
+    STUDENT = 'student'
+    TEACHER = 'teacher'
+    SUBJECT = 'subject'
+    KIND_CHOICES = [(STUDENT, 'Student'), (TEACHER, 'Teacher'), (SUBJECT, 'Subject')]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    label = models.CharField(max_length=255)
+    # URL key of the record: student_id, teacher slug or subject code
+    key = models.CharField(max_length=255)
+    text = models.TextField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.label}"
+
+
+class StoredFile(models.Model):
+    """How many student/teacher records point at a stored media file.
+
+    Maintained by school.media; a file is deleted when its count drops to
+    zero, and the dedupe_media command recounts from the records.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    refcount = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+
+class IdSequence(models.Model):
+    """Next free number of a formatted ID series such as student_id.
+
+    school.ids reserves numbers in blocks with a single UPDATE, so concurrent
+    desks and bulk imports never hand out the same value.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    next_value = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
+
+
+class NotificationState(models.Model):
+    """Per-user notification counters, kept in step with the Notification rows.
+
+    The bell icon on every page reads ``unread_count`` instead of counting
+    the user's unread notifications; school.notifications updates it when
+    notifications are written, marked read or cleared.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True)
+    unread_count = models.PositiveIntegerField(default=0)
+    # Clear-all watermark: notifications created up to here are hidden at
+    # once and deleted in batches in the background
+    cleared_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user}: {self.unread_count} unread"
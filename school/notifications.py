@@ -0,0 +1,201 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+from functools import partial
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Notification, NotificationState
+from .uuids import uuid7
+from . import events
+
+logger = logging.getLogger(__name__)
+
+# Flush once this many notifications are waiting...
+FLUSH_SIZE = getattr(settings, 'NOTIFICATION_FLUSH_SIZE', 100)
+# ...or this many seconds after the first one was buffered
+FLUSH_INTERVAL = getattr(settings, 'NOTIFICATION_FLUSH_INTERVAL', 1.0)
+
+# Unread notifications listed in the navbar dropdown
+DROPDOWN_SIZE = getattr(settings, 'NOTIFICATION_DROPDOWN_SIZE', 5)
+
+
+def adjust_unread(counts):
+    """Add ``{user_id: delta}`` to the users' unread counters with one UPDATE"""
+    if not counts:
+        return
+    NotificationState.objects.filter(user_id__in=counts).update(unread_count=Greatest(
+        F('unread_count') + Case(
+            *[When(user_id=user_id, then=Value(delta)) for user_id, delta in counts.items()],
+            default=Value(0),
+        ),
+        Value(0),
+    ))
+
+
+def save_notifications(notifications, batch_size=FLUSH_SIZE):
+    """Insert notifications and bump their users' unread counters in one transaction"""
+    counts = Counter(notification.user_id for notification in notifications)
+    with transaction.atomic():
+        NotificationState.objects.bulk_create(
+            [NotificationState(user_id=user_id) for user_id in counts], ignore_conflicts=True
+        )
+        # Lock the counters before inserting, so a concurrent clear-all's
+        # watermark lands either before or after all of these rows
+        list(NotificationState.objects.select_for_update().filter(user_id__in=counts).values_list('pk'))
+        # Ids are drawn at write time rather than when notify() buffered the
+        # row, so id order follows write order (event streams resume by id)
+        for notification in notifications:
+            notification.pk = uuid7()
+        Notification.objects.bulk_create(notifications, batch_size=batch_size)
+        adjust_unread(counts)
+        # Push to open notification streams once the rows are visible
+        transaction.on_commit(partial(events.hub.publish, notifications))
+
+
+def notification_state(user):
+    """(unread count, clear-all watermark or None) for a user"""
+    state = NotificationState.objects.filter(user=user).values_list('unread_count', 'cleared_at').first()
+    return state or (0, None)
+
+
+def visible_notifications(user, cleared_at=None):
+    """A user's notifications, minus those a clear-all has hidden but not yet deleted"""
+    notifications = Notification.objects.filter(user=user)
+    if cleared_at is not None:
+        notifications = notifications.filter(created_at__gt=cleared_at)
+    return notifications
+
+
+def latest_unread(user, cleared_at=None, limit=DROPDOWN_SIZE):
+    return (
+        visible_notifications(user, cleared_at).filter(is_read=False)
+        .select_related('user').order_by('-created_at')[:limit]
+    )
+
+
+def mark_all_read(user):
+    with transaction.atomic():
+        # Locking the counter first keeps a concurrent flush from slipping
+        # new unread rows in between the two updates
+        NotificationState.objects.select_for_update().filter(user=user).first()
+        Notification.objects.filter(user=user, is_read=False).update(is_read=True)
+        NotificationState.objects.filter(user=user).update(unread_count=0)
+
+
+def clear_all(user):
+    """Hide all of a user's notifications now; delete them in the background.
+
+    Moving the watermark is a single-row write, however many notifications
+    the user has; the rows go in small batches once the transaction commits.
+    """
+    from . import retention
+
+    with transaction.atomic():
+        NotificationState.objects.update_or_create(
+            user=user, defaults={'unread_count': 0, 'cleared_at': timezone.now()}
+        )
+        transaction.on_commit(partial(retention.delete_cleared_in_background, user.pk))
+
+
+class NotificationBuffer:
+    """In-process write-behind queue of Notification rows, saved with bulk_create"""
+
+    def __init__(self, flush_size=FLUSH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+
+    def add(self, notifications):
+        with self._lock:
+            self._pending.extend(notifications)
+            full = len(self._pending) >= self.flush_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of rows saved"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not batch:
+            return 0
+        try:
+            save_notifications(batch, batch_size=self.flush_size)
+        except Exception:
+            # Notifications are best effort; never fail the caller over them
+            logger.exception("Could not save %d notifications", len(batch))
+            return 0
+        return len(batch)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread has its own connection; don't leak it
+            connection.close()
+
+    def __len__(self):
+        return len(self._pending)
+
+
+buffer = NotificationBuffer()
+atexit.register(buffer.flush)
+
+
+def notify(user, message):
+    """Queue a notification for ``user`` (a user or user pk).
+
+    Inside a transaction the notification is only queued once it commits,
+    and the commit flushes it together with everything else that
+    transaction queued; a rollback drops it. Outside one it is written with
+    the next size- or time-triggered flush, so created_at may trail the
+    event by up to FLUSH_INTERVAL.
+    """
+    notification = Notification(user_id=getattr(user, 'pk', user), message=message)
+    # settings.NOTIFICATION_MODE: 'buffered' batches notifications in memory;
+    # 'sync' inserts each one at once (for tests that assert on the table)
+    if getattr(settings, 'NOTIFICATION_MODE', 'buffered') == 'sync':
+        save_notifications([notification])
+    elif connection.in_atomic_block:
+        _transaction_batch().append(notification)
+    else:
+        buffer.add([notification])
+
+
+class _TransactionBatch(list):
+    """Notifications queued by one transaction, handed to the buffer on commit"""
+
+    def __init__(self):
+        super().__init__()
+        transaction.on_commit(self.commit)
+
+    def commit(self):
+        buffer.add(self)
+        buffer.flush()
+
+
+def _transaction_batch():
+    # A rollback discards the batch's on_commit hook, so only a batch whose
+    # hook is still pending, and was registered in the current savepoint, is
+    # reused: rolling back a nested atomic block must drop what it queued,
+    # not what the outer block did
+    savepoints = set(connection.savepoint_ids)
+    for hook in reversed(connection.run_on_commit):
+        batch = getattr(hook[1], '__self__', None)
+        if isinstance(batch, _TransactionBatch) and hook[0] == savepoints:
+            return batch
+    return _TransactionBatch()
@@ -0,0 +1,102 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset plus cursors for its neighbours"""
+
+    def __init__(self, items, next_cursor, previous_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps([value, pk], default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (value, pk) from a cursor, or None if it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, pk = json.loads(raw)
+        return value, int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def _anchor(model_field, cursor):
+    """Decoded cursor with its value converted by the model field; None if it isn't a valid one"""
+    anchor = decode_cursor(cursor)
+    if anchor is None:
+        return None
+    value, pk = anchor
+    try:
+        value = model_field.to_python(value)
+    except ValidationError:
+        return None
+    return None if value is None else (value, pk)
+
+
+def keyset_paginate(queryset, ordering, after=None, before=None, page_size=25):
+    """Paginate by (ordering field, pk) instead of OFFSET.
+
+    ``ordering`` is a single non-nullable field name, optionally prefixed with
+    '-'; the primary key breaks ties. ``after``/``before`` are cursors from a
+    previous page. Each page costs one query that seeks straight to the
+    cursor, however deep into the result set it is.
+    """
+    descending = ordering.startswith('-')
+    field = ordering.lstrip('-')
+    model_field = queryset.model._meta.get_field(field)
+
+    # A tampered or stale cursor just restarts from the first page
+    anchor = _anchor(model_field, before)
+    backwards = anchor is not None
+    if not backwards:
+        anchor = _anchor(model_field, after)
+
+    # Walking backwards flips the sort; the page is reversed again below
+    scan_descending = descending != backwards
+    if anchor is not None:
+        value, pk = anchor
+        op = 'lt' if scan_descending else 'gt'
+        queryset = queryset.filter(
+            Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'pk__{op}': pk})
+        )
+    prefix = '-' if scan_descending else ''
+    items = list(queryset.order_by(f'{prefix}{field}', f'{prefix}pk')[:page_size + 1])
+
+    has_more = len(items) > page_size
+    items = items[:page_size]
+    if backwards:
+        items.reverse()
+
+    def cursor_for(obj):
+        return encode_cursor(getattr(obj, field), obj.pk)
+
+    if not items:
+        return KeysetPage(items, None, None)
+    next_cursor = cursor_for(items[-1]) if (has_more or backwards) else None
+    previous_cursor = cursor_for(items[0]) if (anchor is not None and (has_more or not backwards)) else None
+    return KeysetPage(items, next_cursor, previous_cursor)
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Notification, NotificationState
+from .notifications import adjust_unread
+
+# Read notifications are deleted this many days after they were created...
+READ_RETENTION_DAYS = getattr(settings, 'NOTIFICATION_READ_RETENTION_DAYS', 30)
+# ...and every notification, read or not, after this many (None keeps unread ones)
+MAX_AGE_DAYS = getattr(settings, 'NOTIFICATION_MAX_AGE_DAYS', 180)
+
+PURGE_BATCH_SIZE = 1000
+
+_clear_lock = threading.Lock()
+_pending_clears = set()
+_clear_worker = None
+
+
+def _delete_in_batches(notifications, batch_size, pause=0.0, count_unread=False):
+    """Delete a queryset of notifications batch_size rows per short transaction.
+
+    With ``count_unread`` the users' unread counters are lowered for the
+    unread rows removed. Returns the number of rows deleted.
+    """
+    deleted = 0
+    while True:
+        batch = list(notifications.order_by().values_list('pk', 'user_id', 'is_read')[:batch_size])
+        if not batch:
+            return deleted
+        with transaction.atomic():
+            removed, _ = Notification.objects.filter(pk__in=[row[0] for row in batch]).delete()
+            if count_unread:
+                adjust_unread({
+                    user_id: -count
+                    for user_id, count in Counter(row[1] for row in batch if not row[2]).items()
+                })
+        deleted += removed
+        if pause:
+            time.sleep(pause)
+
+
+def delete_cleared(user_ids=None, batch_size=PURGE_BATCH_SIZE, pause=0.0):
+    """Delete the notifications hidden by clear-all, for some users or all of them"""
+    states = NotificationState.objects.filter(cleared_at__isnull=False)
+    if user_ids is not None:
+        states = states.filter(user_id__in=user_ids)
+    deleted = 0
+    for user_id, cleared_at in states.values_list('user_id', 'cleared_at'):
+        deleted += _delete_in_batches(
+            Notification.objects.filter(user_id=user_id, created_at__lte=cleared_at), batch_size, pause
+        )
+    return deleted
+
+
+def delete_cleared_in_background(user_id):
+    """Queue a user's cleared notifications for deletion on a daemon thread"""
+    global _clear_worker
+    with _clear_lock:
+        _pending_clears.add(user_id)
+        if _clear_worker is None:
+            _clear_worker = threading.Thread(target=_run_clears, name="delete-cleared-notifications", daemon=True)
+            _clear_worker.start()
+
+
+def _run_clears():
+    global _clear_worker
+    try:
+        while True:
+            with _clear_lock:
+                user_ids = list(_pending_clears)
+                _pending_clears.clear()
+                if not user_ids:
+                    _clear_worker = None
+                    return
+            delete_cleared(user_ids, pause=0.05)
+    except Exception:
+        # Whatever is left is picked up by the next clear or purge run
+        with _clear_lock:
+            _clear_worker = None
+        raise
+    finally:
+        # Background threads get their own connection; don't leak it
+        connection.close()
+
+
+def purge_notifications(read_days=READ_RETENTION_DAYS, max_age_days=MAX_AGE_DAYS,
+                        batch_size=PURGE_BATCH_SIZE, pause=0.0):
+    """Apply the retention policy in small batches; returns deleted counts by reason.
+
+    Finishes any interrupted clear-all first, then removes read notifications
+    older than ``read_days`` and all notifications older than
+    ``max_age_days``, lowering unread counters for the latter.
+    """
+    now = timezone.now()
+    deleted = {'cleared': delete_cleared(batch_size=batch_size, pause=pause)}
+    deleted['read'] = _delete_in_batches(
+        Notification.objects.filter(is_read=True, created_at__lt=now - timedelta(days=read_days)),
+        batch_size, pause
+    )
+    deleted['expired'] = 0
+    if max_age_days is not None:
+        deleted['expired'] = _delete_in_batches(
+            Notification.objects.filter(created_at__lt=now - timedelta(days=max_age_days)),
+            batch_size, pause, count_unread=True
+        )
+    return deleted
@@ -0,0 +1,191 @@
+import re
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.db import connections, router
+from django.urls import reverse
+
+from student.models import Student
+from subject.models import Subject
+from teacher.models import Teacher
+from .models import SearchDocument
+
+FTS_TABLE = 'school_searchdocument_fts'
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Extra words in a query add little but make the match more expensive
+MAX_TERMS = 8
+# bm25 ranks only this many FTS matches; ranking every hit of a one-letter
+# prefix would cost tens of milliseconds on a large school
+RANK_WINDOW = 200
+
+REBUILD_CHUNK_SIZE = 1000
+
+_batch = threading.local()
+
+KIND_URLS = {
+    SearchDocument.STUDENT: 'view_student',
+    SearchDocument.TEACHER: 'view_teacher',
+    SearchDocument.SUBJECT: 'edit_subject',
+}
+
+
+def _student_document(student):
+    return SearchDocument(
+        kind=SearchDocument.STUDENT,
+        object_id=student.pk,
+        label=f"{student.first_name} {student.last_name} ({student.student_id})",
+        key=student.student_id,
+        text=_normalize(student.first_name, student.last_name, student.student_id,
+                        student.admission_number, student.student_email),
+    )
+
+
+def _teacher_document(teacher):
+    return SearchDocument(
+        kind=SearchDocument.TEACHER,
+        object_id=teacher.pk,
+        label=f"{teacher.first_name} {teacher.last_name} ({teacher.teacher_id})",
+        key=teacher.slug,
+        text=_normalize(teacher.first_name, teacher.last_name, teacher.teacher_id,
+                        teacher.email, teacher.department),
+    )
+
+
+def _subject_document(subject):
+    return SearchDocument(
+        kind=SearchDocument.SUBJECT,
+        object_id=subject.pk,
+        label=f"{subject.name} ({subject.code})",
+        key=subject.code,
+        text=_normalize(subject.name, subject.code),
+    )
+
+
+DOCUMENT_BUILDERS = {
+    Student: _student_document,
+    Teacher: _teacher_document,
+    Subject: _subject_document,
+}
+
+KIND_MODELS = {
+    SearchDocument.STUDENT: Student,
+    SearchDocument.TEACHER: Teacher,
+    SearchDocument.SUBJECT: Subject,
+}
+
+
+def _normalize(*values):
+    return ' '.join(str(value) for value in values if value).lower()
+
+
+def _terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def index_objects(objects):
+    """Add or refresh the search documents of saved students, teachers or subjects"""
+    documents = [DOCUMENT_BUILDERS[type(obj)](obj) for obj in objects]
+    if documents:
+        SearchDocument.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=['kind', 'object_id'],
+            update_fields=['label', 'key', 'text'],
+        )
+
+
+def remove_objects(model, object_ids):
+    kind = next(kind for kind, kind_model in KIND_MODELS.items() if kind_model is model)
+    pending = getattr(_batch, 'removals', None)
+    if pending is not None:
+        pending.setdefault(kind, []).extend(object_ids)
+        return
+    SearchDocument.objects.filter(kind=kind, object_id__in=list(object_ids)).delete()
+
+
+@contextmanager
+def batched_removals():
+    """Collect removals (e.g. from delete signals) and run them as one query per kind on exit"""
+    if getattr(_batch, 'removals', None) is not None:
+        yield
+        return
+    _batch.removals = {}
+    try:
+        yield
+        removals = _batch.removals
+    finally:
+        _batch.removals = None
+    for kind, object_ids in removals.items():
+        SearchDocument.objects.filter(kind=kind, object_id__in=object_ids).delete()
+
+
+def rebuild_index():
+    """Re-create every search document from the source tables; returns the count"""
+    SearchDocument.objects.all().delete()
+    total = 0
+    for model in KIND_MODELS.values():
+        chunk = []
+        for obj in model.objects.order_by('pk').iterator(chunk_size=REBUILD_CHUNK_SIZE):
+            chunk.append(obj)
+            if len(chunk) == REBUILD_CHUNK_SIZE:
+                index_objects(chunk)
+                total += len(chunk)
+                chunk = []
+        index_objects(chunk)
+        total += len(chunk)
+
+    connection = connections[router.db_for_write(SearchDocument)]
+    if _has_fts(connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return total
+
+
+@lru_cache(maxsize=None)
+def _has_fts(alias):
+    connection = connections[alias]
+    return connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+
+
+def search(query, kinds=None, limit=DEFAULT_LIMIT):
+    """Prefix search over students, teachers and subjects.
+
+    Every word of ``query`` must prefix-match a word of the document. On
+    SQLite this is an FTS5 MATCH, the first RANK_WINDOW hits ranked by bm25;
+    on PostgreSQL a trigram-indexed LIKE; elsewhere an unindexed LIKE.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    alias = router.db_for_read(SearchDocument)
+    if _has_fts(alias):
+        match = 'text : (' + ' '.join(f'"{term}"*' for term in terms) + ')'
+        if kinds:
+            match = 'kind : (' + ' OR '.join(f'"{kind}"' for kind in kinds) + ') AND ' + match
+        sql = (
+            f"SELECT d.id, d.kind, d.object_id, d.label, d.key FROM "
+            f"(SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT %s) f "
+            f"JOIN school_searchdocument d ON d.id = f.rowid ORDER BY f.rank LIMIT %s"
+        )
+        return list(SearchDocument.objects.using(alias).raw(sql, [match, RANK_WINDOW, limit]))
+
+    documents = SearchDocument.objects.using(alias).only('kind', 'object_id', 'label', 'key')
+    for term in terms:
+        documents = documents.filter(text__contains=term)
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    return list(documents.order_by('label')[:limit])
+
+
+def as_result(document):
+    return {
+        'kind': document.kind,
+        'id': document.object_id,
+        'label': document.label,
+        'url': reverse(KIND_URLS[document.kind], args=[document.key]),
+    }
@@ -0,0 +1,53 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from student.models import Student
+from subject.models import Subject
+from teacher.models import Teacher
+from . import media, search, thumbnails
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Teacher)
+@receiver(post_save, sender=Subject)
+def index_search_document(sender, instance, **kwargs):
+    search.index_objects([instance])
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Teacher)
+@receiver(post_delete, sender=Subject)
+def remove_search_document(sender, instance, **kwargs):
+    search.remove_objects(sender, [instance.pk])
+
+
+@receiver(pre_save, sender=Student)
+@receiver(pre_save, sender=Teacher)
+def remember_previous_image(sender, instance, **kwargs):
+    previous = ''
+    if instance.pk:
+        field = media.IMAGE_FIELDS[sender]
+        previous = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first() or ''
+    instance._previous_image = previous
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Teacher)
+def track_image(sender, instance, **kwargs):
+    image = media.image_of(instance)
+    previous = getattr(instance, '_previous_image', '')
+    if (image.name or '') != previous:
+        if image:
+            media.acquire(image.name)
+        if previous:
+            media.release(previous)
+    if image:
+        thumbnails.schedule_thumbnails(image.name)
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Teacher)
+def release_image(sender, instance, **kwargs):
+    image = media.image_of(instance)
+    if image:
+        media.release(image.name)
@@ -0,0 +1,53 @@
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+CONTENT_DIR = 'content'
+# Files in a directory with this name are derived from a content-addressed
+# original (see school/thumbnails.py) and keep the name they are given
+DERIVED_DIRNAME = 'thumbs'
+
+
+def content_name(digest, original_name):
+    """content/ab/abcdef...png for a SHA-256 digest and the uploaded file's name"""
+    extension = os.path.splitext(original_name)[1].lower()
+    return os.path.join(CONTENT_DIR, digest[:2], f"{digest}{extension}")
+
+
+def hash_file(content):
+    """SHA-256 hex digest of a Django File, read in chunks"""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Stores each distinct file once, named by the SHA-256 of its bytes.
+
+    Saving content that is already stored writes nothing and returns the
+    existing name, so re-uploading a photo costs no disk space. Files are
+    never overwritten in place; school.media tracks how many records point
+    at each one and removes those nobody uses.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        if name.startswith(CONTENT_DIR + '/'):
+            # Only reached when two processes store the same new file at once
+            return super().get_available_name(name, max_length)
+        # Uploads are renamed after their content in _save, so there is
+        # nothing to de-clash yet; this also skips the exists() probes
+        return name
+
+    def _save(self, name, content):
+        if os.path.basename(os.path.dirname(name)) == DERIVED_DIRNAME:
+            if self.exists(name):
+                self.delete(name)
+            return super()._save(name, content)
+
+        name = content_name(hash_file(content), name)
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
@@ -0,0 +1,11 @@
+from django import template
+
+from school.thumbnails import thumbnail_url
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail(image, variant='avatar'):
+    """{{ student.student_image|thumbnail:'card' }} -> URL of the resized variant"""
+    return thumbnail_url(image, variant)
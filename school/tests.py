@@ -1,3 +1,145 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from student.models import Parent, Student
+from . import ids, notifications
+from .models import Notification
+from .notifications import NotificationBuffer, notify
+
+
+def _messages(user):
+    return sorted(Notification.objects.filter(user=user).values_list('message', flat=True))
+
+
+@override_settings(NOTIFICATION_MODE='buffered')
+class BufferedNotificationTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='secret')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='secret')
+
+    def test_buffer_flushes_when_full(self):
+        buffer = NotificationBuffer(flush_size=3, flush_interval=60)
+        buffer.add([Notification(user=self.alice, message="one"), Notification(user=self.bob, message="two")])
+        self.assertEqual(len(buffer), 2)
+        self.assertFalse(Notification.objects.exists())
+
+        buffer.add([Notification(user=self.alice, message="three")])
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(_messages(self.alice), ["one", "three"])
+        self.assertEqual(_messages(self.bob), ["two"])
+
+    def test_transaction_flushes_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notify(self.alice, "Added Student")
+            notify(self.alice.pk, "Added Teacher")
+            self.assertFalse(Notification.objects.exists())
+        self.assertEqual(_messages(self.alice), ["Added Student", "Added Teacher"])
+
+    def test_rollback_drops_queued_notifications(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notify(self.alice, "kept")
+            try:
+                with transaction.atomic():
+                    notify(self.alice, "rolled back")
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+        self.assertEqual(_messages(self.alice), ["kept"])
+
+    def test_unread_counter_matches_rows(self):
+        buffer = NotificationBuffer(flush_size=2, flush_interval=60)
+        buffer.add([Notification(user=self.alice, message=str(n)) for n in range(4)])
+        buffer.add([Notification(user=self.bob, message="bob")])
+        buffer.flush()
+        self.assertEqual(notifications.notification_state(self.alice), (4, None))
+        self.assertEqual(notifications.notification_state(self.bob), (1, None))
+
+        notifications.mark_all_read(self.alice)
+        self.assertEqual(notifications.notification_state(self.alice), (0, None))
+        self.assertFalse(Notification.objects.filter(user=self.alice, is_read=False).exists())
+        self.assertEqual(notifications.notification_state(self.bob), (1, None))
+
+        buffer.add([Notification(user=self.alice, message="new")])
+        buffer.flush()
+        self.assertEqual(notifications.notification_state(self.alice)[0], 1)
+
+        notifications.clear_all(self.alice)
+        unread_count, cleared_at = notifications.notification_state(self.alice)
+        self.assertEqual(unread_count, 0)
+        self.assertIsNotNone(cleared_at)
+        self.assertFalse(notifications.visible_notifications(self.alice, cleared_at).exists())
+
+    @override_settings(NOTIFICATION_MODE='sync')
+    def test_sync_mode_writes_at_once(self):
+        notify(self.alice, "now")
+        self.assertEqual(_messages(self.alice), ["now"])
+        self.assertEqual(notifications.notification_state(self.alice), (1, None))
+
+
+def _student(student_id, admission_number=''):
+    parent = Parent.objects.create(
+        father_name="John", father_mobile="5550100", father_email="john@example.com",
+        mother_name="Mary", mother_mobile="5550101", mother_email="mary@example.com",
+        present_address="1 School Road", permanent_address="1 School Road",
+    )
+    return Student.objects.create(
+        first_name="Sam", last_name="Lee", student_id=student_id, gender="Male",
+        date_of_birth=datetime.date(2010, 1, 1), student_class="5", religion="None",
+        joining_date=datetime.date(2020, 9, 1), mobile_number="5550102",
+        admission_number=admission_number, section="A", student_email="sam@example.com", parent=parent,
+    )
+
+
+class AllocateIdTests(TestCase):
+    # Inside a transaction every allocation reserves its numbers directly
+
+    def setUp(self):
+        ids._blocks.clear()
+
+    def test_first_ids_of_a_sequence(self):
+        self.assertEqual(ids.allocate('student_id'), ['S000001'])
+        self.assertEqual(ids.allocate('admission_number', 2), ['ADM000001', 'ADM000002'])
+        self.assertEqual(ids.allocate('teacher_id'), ['T0001'])
+
+    def test_sequence_starts_after_highest_existing_id(self):
+        _student('S000041')
+        _student('legacy-7')
+        self.assertEqual(ids.allocate('student_id'), ['S000042'])
+
+    def test_skips_ids_typed_in_by_hand(self):
+        self.assertEqual(ids.allocate('student_id'), ['S000001'])
+        _student('S000002')
+        _student('S000004')
+        self.assertEqual(ids.allocate('student_id', 3), ['S000003', 'S000005', 'S000006'])
+
+    def test_allocations_do_not_collide(self):
+        first = ids.allocate('student_id', 5)
+        second = ids.allocate('student_id', 3)
+        self.assertEqual(len(set(first) | set(second)), 8)
+
+
+class BlockAllocateIdTests(TransactionTestCase):
+    # Outside a transaction numbers come from the per-process block
+
+    def setUp(self):
+        ids._blocks.clear()
+
+    def tearDown(self):
+        ids._blocks.clear()
+
+    def test_block_skips_ids_typed_in_by_hand(self):
+        self.assertEqual(ids.allocate('student_id'), ['S000001'])
+        _student('S000002')
+        self.assertEqual(ids.allocate('student_id', 2), ['S000003', 'S000004'])
+
+    def test_processes_get_disjoint_blocks(self):
+        first = ids.allocate('student_id')
+        # Another process reserves its own block from the shared counter
+        ids._blocks.clear()
+        second = ids.allocate('student_id')
+        self.assertEqual(first, ['S000001'])
+        self.assertEqual(second, [ids.format_id('student_id', ids.BLOCK_SIZE + 1)])
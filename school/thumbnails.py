@@ -0,0 +1,115 @@
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# name -> (width, height, crop). Cropped variants fill the box exactly;
+# the others are scaled down to fit inside it.
+VARIANTS = {
+    'avatar': (96, 96, True),
+    'card': (320, 320, True),
+    'detail': (800, 800, False),
+}
+
+SAVE_OPTIONS = {
+    'WEBP': {'quality': 80, 'method': 4},
+    'JPEG': {'quality': 80, 'optimize': True},
+}
+
+THUMBNAIL_WORKERS = getattr(settings, 'THUMBNAIL_WORKERS', 2)
+
+_executor = None
+
+
+@lru_cache(maxsize=None)
+def _output_format():
+    from PIL import features
+    return ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+
+
+def variant_name(name, variant):
+    """Storage name of a variant: students/a.png -> students/thumbs/a.avatar.webp"""
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'thumbs', f"{stem}.{variant}.{_output_format()[1]}")
+
+
+def generate_thumbnails(name, force=False, storage=default_storage):
+    """Write every missing variant of one stored image; returns how many were written"""
+    from PIL import Image, ImageOps
+
+    targets = {variant: variant_name(name, variant) for variant in VARIANTS}
+    if not force:
+        targets = {variant: target for variant, target in targets.items() if not storage.exists(target)}
+    if not targets:
+        return 0
+
+    image_format, _ = _output_format()
+    with storage.open(name, 'rb') as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original = original.convert('RGBA' if image_format == 'WEBP' else 'RGB')
+    # Shrink full-screen uploads once up front so each variant below is
+    # resampled from at most twice the largest variant's size
+    largest = max(max(width, height) for width, height, _ in VARIANTS.values())
+    original.thumbnail((largest * 2, largest * 2), Image.LANCZOS)
+    for variant, target in targets.items():
+        width, height, crop = VARIANTS[variant]
+        if crop:
+            resized = ImageOps.fit(original, (width, height), Image.LANCZOS)
+        else:
+            resized = original.copy()
+            resized.thumbnail((width, height), Image.LANCZOS)
+        output = io.BytesIO()
+        resized.save(output, image_format, **SAVE_OPTIONS[image_format])
+        if storage.exists(target):
+            storage.delete(target)
+        storage.save(target, ContentFile(output.getvalue()))
+    return len(targets)
+
+
+def delete_thumbnails(name, storage=default_storage):
+    for variant in VARIANTS:
+        target = variant_name(name, variant)
+        if storage.exists(target):
+            storage.delete(target)
+
+
+def _executor_instance():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix='thumbnails')
+    return _executor
+
+
+def _generate_logged(name):
+    try:
+        generate_thumbnails(name)
+    except Exception:
+        logger.exception("Could not generate thumbnails for %s", name)
+
+
+def schedule_thumbnails(name):
+    """Generate the variants of ``name`` on the thumbnail pool once the upload commits.
+
+    The pool lives in this process, so work still queued when it exits is
+    lost; the generate_thumbnails command fills any such gaps.
+    """
+    transaction.on_commit(lambda: _executor_instance().submit(_generate_logged, name))
+
+
+def thumbnail_url(image, variant):
+    """URL of a variant if it has been generated, else of the original image"""
+    if not image:
+        return ''
+    target = variant_name(image.name, variant)
+    if image.storage.exists(target):
+        return image.storage.url(target)
+    return image.url
@@ -7,6 +7,8 @@ urlpatterns = [
    path('dashboard/', views.dashboard, name='dashboard'), 
    path('notification/mark-as-read/', views.mark_notification_as_read, name='mark_notification_as_read' ),
    path('notification/clear-all', views.clear_all_notification, name= "clear_all_notification"),
+   path('notification/stream/', views.notification_stream, name='notification_stream'),
+   path('search/', views.search_autocomplete, name='search_autocomplete'),
    
 
 ]
\ No newline at end of file
@@ -1,7 +1,29 @@
-from django.http import HttpResponse
+import asyncio
+import json
+import time
+import uuid
+
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
 from django.http import JsonResponse
-from .models import Notification
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
+from .models import SearchDocument
+from .uuids import uuid7_floor, uuid7_time_ms
+from . import events, notifications, search
+
+# Seconds between comment lines that keep idle streams (and proxies) open
+STREAM_KEEPALIVE = 15
+# How long browsers wait before reconnecting; under WSGI this is the poll interval
+STREAM_RETRY_MS = 3000
+WSGI_POLL_RETRY_MS = 15000
+# Notifications replayed to a reconnecting stream at most
+STREAM_BACKLOG = 50
+# Replay also covers ids this many seconds older than the browser's cursor:
+# a transaction in another worker can commit after one with a newer id.
+# Browsers drop events they already have.
+STREAM_REPLAY_GRACE = 5
 
 # Create your views here.
 
@@ -9,22 +31,117 @@ def index(request):
     return render(request, "authentication/login.html")
 
 def dashboard(request):
-    unread_notification = Notification.objects.filter(user=request.user, is_read=False)
-    unread_notification_count = unread_notification.count()
     return render(request, "students/student-dashboard.html")
 
 
 
 def mark_notification_as_read(request):
     if request.method == 'POST':
-        notification = Notification.objects.filter(user=request.user, is_read=False)
-        notification.update(is_read=True)
+        notifications.mark_all_read(request.user)
         return JsonResponse({'status': 'success'})
     return HttpResponseForbidden()
 
 def clear_all_notification(request):
     if request.method == "POST":
-        notification = Notification.objects.filter(user=request.user)
-        notification.delete()
+        notifications.clear_all(request.user)
         return JsonResponse({'status': 'success'})
-    return HttpResponseForbidden
\ No newline at end of file
+    return HttpResponseForbidden
+
+
+@login_required
+def search_autocomplete(request):
+    """Prefix autocomplete over students, teachers and subjects, as JSON"""
+    kinds = [kind for kind in request.GET.getlist('kind') if kind in dict(SearchDocument.KIND_CHOICES)]
+    try:
+        limit = int(request.GET.get('limit', search.DEFAULT_LIMIT))
+    except ValueError:
+        limit = search.DEFAULT_LIMIT
+    documents = search.search(request.GET.get('q', ''), kinds=kinds, limit=limit)
+    return JsonResponse({'results': [search.as_result(document) for document in documents]})
+
+
+def _sse(event):
+    return f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event)}\n\n"
+
+
+def _preamble(retry_ms, last_event_id):
+    preamble = f"retry: {retry_ms}\n"
+    if not _parse_event_id(last_event_id):
+        # A first connection gets a cursor, so that its reconnects (or polls)
+        # ask for what arrived after this moment; it sits one grace period
+        # ahead so the replay window starts now, after what the page rendered
+        now_ms = time.time_ns() // 1_000_000
+        preamble += f"id: {uuid7_floor(now_ms + STREAM_REPLAY_GRACE * 1000)}\n"
+    return preamble + "\n"
+
+
+def _parse_event_id(value):
+    try:
+        return uuid.UUID(value or '')
+    except ValueError:
+        return None
+
+
+def _missed_events(user, last_event_id):
+    """Unread notifications a reconnecting browser may have missed.
+
+    Notification ids are time-ordered, so this is a primary key range: from
+    STREAM_REPLAY_GRACE before the last id the browser saw, onwards.
+    """
+    last_id = _parse_event_id(last_event_id)
+    if last_id is None:
+        return []
+    since = uuid7_floor(uuid7_time_ms(last_id) - STREAM_REPLAY_GRACE * 1000)
+    _, cleared_at = notifications.notification_state(user)
+    missed = (
+        notifications.visible_notifications(user, cleared_at)
+        .filter(is_read=False, pk__gte=since).exclude(pk=last_id).order_by('pk')[:STREAM_BACKLOG]
+    )
+    return [events.as_event(notification) for notification in missed]
+
+
+async def _event_stream(user, last_event_id):
+    # Subscribe before reading the backlog so nothing slips in between
+    queue = events.hub.subscribe(user.pk)
+    try:
+        yield _preamble(STREAM_RETRY_MS, last_event_id)
+        replayed = set()
+        for event in await sync_to_async(_missed_events)(user, last_event_id):
+            replayed.add(event['id'])
+            yield _sse(event)
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event['id'] not in replayed:
+                yield _sse(event)
+    finally:
+        # Runs when the browser disconnects and the server cancels the stream
+        events.hub.unsubscribe(user.pk, queue)
+
+
+async def notification_stream(request):
+    """Server-Sent Events stream of the signed-in user's new notifications.
+
+    Under ASGI the connection stays open and parks on a hub queue between
+    events, so idle browsers cost no queries and no thread. Under WSGI, which
+    would tie up a worker per browser, it answers with whatever arrived
+    since Last-Event-ID and has the browser reconnect later, i.e. polling.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    last_event_id = request.headers.get('Last-Event-ID')
+
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(_event_stream(user, last_event_id), content_type='text/event-stream')
+    else:
+        missed = await sync_to_async(_missed_events)(user, last_event_id)
+        body = _preamble(WSGI_POLL_RETRY_MS, last_event_id) + ''.join(_sse(event) for event in missed)
+        response = HttpResponse(body, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,97 @@
+// Live navbar bell fed by the server's notification event stream.
+//
+// <script src="notification-stream.js" data-url="/notification/stream/"
+//         data-username="..." data-avatar="..." data-limit="5"></script>
+//
+// Each new notification bumps the badge and is prepended to the dropdown,
+// which keeps at most data-limit items. EventSource reconnects by itself
+// and resumes from the last notification it received; the server replays a
+// few seconds before that point, so notifications already shown (by id)
+// are skipped.
+(function () {
+    var script = document.currentScript;
+    if (!script || !window.EventSource) {
+        return;
+    }
+    var limit = parseInt(script.dataset.limit, 10) || 5;
+    var seen = {};
+
+    Array.prototype.forEach.call(document.querySelectorAll('.notification-message[data-id]'), function (item) {
+        seen[item.dataset.id] = true;
+    });
+
+    function bumpBadge() {
+        var toggle = document.querySelector('.noti-dropdown .dropdown-toggle');
+        if (!toggle) {
+            return;
+        }
+        var badge = toggle.querySelector('.badge');
+        if (!badge) {
+            toggle.innerHTML = '<i class="far fa-bell"></i> <span class="badge badge-pill">0</span>';
+            badge = toggle.querySelector('.badge');
+        }
+        badge.textContent = (parseInt(badge.textContent, 10) || 0) + 1;
+    }
+
+    function element(tag, className, text) {
+        var node = document.createElement(tag);
+        if (className) {
+            node.className = className;
+        }
+        if (text !== undefined) {
+            node.textContent = text;
+        }
+        return node;
+    }
+
+    function prepend(notification) {
+        var list = document.querySelector('.notification-list');
+        if (!list) {
+            return;
+        }
+        // Drop the "No new notifications" placeholder left by Clear All
+        Array.prototype.forEach.call(list.querySelectorAll('li:not(.notification-message)'), function (item) {
+            item.remove();
+        });
+
+        var item = element('li', 'notification-message');
+        var link = element('a');
+        var media = element('div', 'media');
+        var avatar = element('span', 'avatar avatar-sm');
+        var image = element('img', 'avatar-img rounded-circle');
+        var body = element('div', 'media-body');
+        var details = element('p', 'noti-details');
+        var time = element('p', 'noti-time');
+
+        item.dataset.id = notification.id;
+        link.href = '#';
+        image.alt = 'User Image';
+        image.src = script.dataset.avatar;
+        details.appendChild(element('span', 'noti-title', script.dataset.username));
+        details.appendChild(document.createTextNode(' ' + notification.message + ' '));
+        time.appendChild(element('span', 'notification-time', 'just now'));
+        avatar.appendChild(image);
+        body.appendChild(details);
+        body.appendChild(time);
+        media.appendChild(avatar);
+        media.appendChild(body);
+        link.appendChild(media);
+        item.appendChild(link);
+        list.insertBefore(item, list.firstChild);
+
+        while (list.children.length > limit) {
+            list.removeChild(list.lastChild);
+        }
+    }
+
+    var source = new EventSource(script.dataset.url);
+    source.addEventListener('notification', function (event) {
+        var notification = JSON.parse(event.data);
+        if (seen[notification.id]) {
+            return;
+        }
+        seen[notification.id] = true;
+        bumpBadge();
+        prepend(notification);
+    });
+})();
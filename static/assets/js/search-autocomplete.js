@@ -0,0 +1,125 @@
+// Prefix autocomplete backed by the school search index.
+//
+// <input data-autocomplete="student,subject" data-url="/search/" data-target="student_id">
+//
+// data-autocomplete lists the kinds to search (empty for all). With
+// data-target, picking a result writes its id into that hidden input;
+// without it, picking a result opens the record's page.
+(function () {
+    var DELAY_MS = 150;
+
+    function attach(input) {
+        var kinds = (input.dataset.autocomplete || '').split(',').filter(Boolean);
+        var target = input.dataset.target ? document.getElementById(input.dataset.target) : null;
+        var list = document.createElement('ul');
+        var timer = null;
+        var controller = null;
+        var results = [];
+        var active = -1;
+
+        list.className = 'search-autocomplete';
+        list.style.cssText = 'position:absolute;z-index:1050;display:none;list-style:none;margin:0;padding:0;' +
+            'background:#fff;border:1px solid #ddd;border-radius:4px;max-height:300px;overflow-y:auto;';
+        input.setAttribute('autocomplete', 'off');
+        input.parentNode.style.position = 'relative';
+        input.parentNode.appendChild(list);
+
+        function close() {
+            list.style.display = 'none';
+            active = -1;
+        }
+
+        function highlight(index) {
+            active = index;
+            Array.prototype.forEach.call(list.children, function (item, i) {
+                item.style.background = i === active ? '#e9ecef' : '';
+            });
+        }
+
+        function pick(result) {
+            if (target) {
+                target.value = result.id;
+                input.value = result.label;
+                close();
+            } else {
+                window.location.href = result.url;
+            }
+        }
+
+        function render() {
+            list.innerHTML = '';
+            results.forEach(function (result, i) {
+                var item = document.createElement('li');
+                item.textContent = kinds.length === 1 ? result.label : result.label + ' · ' + result.kind;
+                item.style.cssText = 'padding:6px 10px;cursor:pointer;';
+                item.addEventListener('mousedown', function (event) {
+                    event.preventDefault();
+                    pick(result);
+                });
+                item.addEventListener('mouseenter', function () { highlight(i); });
+                list.appendChild(item);
+            });
+            list.style.top = (input.offsetTop + input.offsetHeight) + 'px';
+            list.style.left = input.offsetLeft + 'px';
+            list.style.minWidth = input.offsetWidth + 'px';
+            list.style.display = results.length ? 'block' : 'none';
+            active = -1;
+        }
+
+        function lookup() {
+            var query = input.value.trim();
+            if (controller) {
+                controller.abort();
+            }
+            if (!query) {
+                results = [];
+                render();
+                return;
+            }
+            var params = new URLSearchParams({ q: query });
+            kinds.forEach(function (kind) { params.append('kind', kind); });
+            controller = new AbortController();
+            fetch(input.dataset.url + '?' + params, { signal: controller.signal, credentials: 'same-origin' })
+                .then(function (response) { return response.json(); })
+                .then(function (data) {
+                    results = data.results;
+                    render();
+                })
+                .catch(function (error) {
+                    if (error.name !== 'AbortError') {
+                        console.error('Search failed:', error);
+                    }
+                });
+        }
+
+        input.addEventListener('input', function () {
+            if (target) {
+                // The typed text no longer names the picked record
+                target.value = '';
+            }
+            clearTimeout(timer);
+            timer = setTimeout(lookup, DELAY_MS);
+        });
+
+        input.addEventListener('keydown', function (event) {
+            if (event.key === 'ArrowDown' && results.length) {
+                event.preventDefault();
+                highlight((active + 1) % results.length);
+            } else if (event.key === 'ArrowUp' && results.length) {
+                event.preventDefault();
+                highlight((active - 1 + results.length) % results.length);
+            } else if (event.key === 'Enter' && list.style.display === 'block') {
+                event.preventDefault();
+                pick(results[active >= 0 ? active : 0]);
+            } else if (event.key === 'Escape') {
+                close();
+            }
+        });
+
+        input.addEventListener('blur', close);
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('input[data-autocomplete]').forEach(attach);
+    });
+})();
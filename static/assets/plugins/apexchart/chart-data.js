@@ -2,6 +2,23 @@
 
 $(document).ready(function() {
 
+	// Charts whose element has a data-source attribute replace their demo
+	// series with live data, e.g. the /analytics/stats/<grouping>/ endpoints
+	function loadChartData(selector, chart) {
+		var source = $(selector).data('source');
+		if (!source) {
+			return;
+		}
+		$.getJSON(source, function(response) {
+			var data = response.chart || response;
+			chart.updateOptions({
+				series: data.series,
+				labels: data.categories,
+				xaxis: { categories: data.categories }
+			});
+		});
+	}
+
 	// Area chart
 	
 	if ($('#apexcharts-area').length > 0) {
@@ -36,6 +53,7 @@ $(document).ready(function() {
 		options
 	);
 	chart.render();
+	loadChartData('#apexcharts-area', chart);
 	}
 
 	// Bar chart
@@ -105,6 +123,7 @@ $(document).ready(function() {
   
 	var chartBar = new ApexCharts(document.querySelector('#bar'), optionsBar);
 	chartBar.render();
+	loadChartData('#bar', chartBar);
 	}
   
 });
\ No newline at end of file
@@ -0,0 +1,177 @@
+import re
+import threading
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, Value, When
+from django.utils import timezone
+
+from school import search
+from .models import Student, Parent
+
+# student_class value whose students leave the school at rollover
+GRADUATING_CLASS = getattr(settings, 'STUDENT_GRADUATING_CLASS', '12')
+
+# Fields the bulk edit form may set on many students at once
+BULK_EDITABLE_FIELDS = ('student_class', 'section', 'religion', 'joining_date')
+
+DELETE_BATCH_SIZE = 500
+ORPHAN_BATCH_SIZE = 1000
+
+_orphan_collector_lock = threading.Lock()
+
+_CLASS_NUMBER = re.compile(r'^(.*?)(\d+)(\D*)$')
+
+
+def next_class(student_class):
+    """'5' -> '6', 'Grade 5' -> 'Grade 6'; None if the class has no number to bump"""
+    match = _CLASS_NUMBER.match(student_class)
+    if match is None:
+        return None
+    prefix, number, suffix = match.groups()
+    return f"{prefix}{int(number) + 1}{suffix}"
+
+
+def _after_bulk_change():
+    # Queryset.update() sends no post_save, which is what normally tells
+    # the cohort statistics that classes and sections moved (and update()
+    # skips auto_now, so callers set updated_at themselves)
+    from analytics import cohort_stats
+    transaction.on_commit(cohort_stats.invalidate)
+
+
+def promotion_plan(graduating_class=GRADUATING_CLASS):
+    """[(class, next class or None to archive, student count)] for active students.
+
+    Classes without a number are left where they are and reported with
+    themselves as the target.
+    """
+    counts = (
+        Student.objects.filter(is_archived=False).order_by()
+        .values_list('student_class').annotate(total=Count('id'))
+    )
+    plan = []
+    for student_class, total in counts:
+        if student_class == graduating_class:
+            target = None
+        else:
+            target = next_class(student_class) or student_class
+        plan.append((student_class, target, total))
+    return sorted(plan, key=lambda row: (len(row[0]), row[0]))
+
+
+def promote_students(dry_run=False, graduating_class=GRADUATING_CLASS):
+    """Move every active student up one class and archive the graduating class.
+
+    All classes move in a single UPDATE whose CASE maps each old class to its
+    new one, so no student is promoted twice. Returns the plan.
+    """
+    with transaction.atomic():
+        plan = promotion_plan(graduating_class)
+        if dry_run:
+            return plan
+        moves = [When(student_class=old, then=Value(new)) for old, new, _ in plan if new not in (None, old)]
+        Student.objects.filter(is_archived=False).update(
+            is_archived=Case(When(student_class=graduating_class, then=Value(True)), default=F('is_archived')),
+            student_class=Case(*moves, default=F('student_class')),
+            updated_at=timezone.now(),
+        )
+        _after_bulk_change()
+    return plan
+
+
+def reassign_section(student_class, section, from_section=None, dry_run=False):
+    """Put every active student of a class (optionally of one section) into ``section``"""
+    students = Student.objects.filter(is_archived=False, student_class=student_class)
+    if from_section:
+        students = students.filter(section=from_section)
+    with transaction.atomic():
+        if dry_run:
+            return students.count()
+        updated = students.update(section=section, updated_at=timezone.now())
+        _after_bulk_change()
+    return updated
+
+
+def bulk_update_students(students, values, dry_run=False):
+    """Set the same field values on every student in a queryset with one UPDATE.
+
+    Values are validated by the model fields first (ValidationError on bad
+    input, ValueError for fields that are not bulk editable). Returns the
+    number of students affected.
+    """
+    unknown = set(values) - set(BULK_EDITABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot bulk edit: {', '.join(sorted(unknown))}")
+    cleaned = {name: Student._meta.get_field(name).clean(value, None) for name, value in values.items()}
+    with transaction.atomic():
+        if dry_run:
+            return students.count()
+        updated = students.update(**cleaned, updated_at=timezone.now())
+        _after_bulk_change()
+    return updated
+
+
+def delete_students(student_ids, batch_size=DELETE_BATCH_SIZE):
+    """Delete students together with their parents, batch_size per transaction.
+
+    Deleting a Parent cascades to its Student (and on to grades and
+    analytics), so each batch is one parent delete. The delete signals that
+    keep search and media in sync still fire; search removals are gathered
+    into one query per batch. Returns the number of students deleted.
+    """
+    deleted = 0
+    ids = iter(sorted(set(int(pk) for pk in student_ids)))
+    while True:
+        batch = list(islice(ids, batch_size))
+        if not batch:
+            break
+        with transaction.atomic(), search.batched_removals():
+            parent_ids = list(Student.objects.filter(pk__in=batch).values_list('parent_id', flat=True))
+            _, counts = Parent.objects.filter(pk__in=parent_ids).delete()
+        deleted += counts.get(Student._meta.label, 0)
+    return deleted
+
+
+def collect_orphan_parents(batch_size=ORPHAN_BATCH_SIZE, pause=0.0):
+    """Delete Parent rows no student points at, walking the table in pk order.
+
+    Each batch is found with a short keyset scan and deleted in its own
+    transaction (re-checking that it is still unused), so no lock is held
+    for longer than one batch. ``pause`` seconds between batches leave room
+    for other writers. Returns the number of parents deleted.
+    """
+    deleted = 0
+    last_pk = 0
+    while True:
+        orphans = list(
+            Parent.objects.filter(pk__gt=last_pk, student__isnull=True)
+            .order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not orphans:
+            break
+        last_pk = orphans[-1]
+        with transaction.atomic():
+            _, counts = Parent.objects.filter(pk__in=orphans, student__isnull=True).delete()
+        deleted += counts.get(Parent._meta.label, 0)
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+def collect_orphan_parents_in_background(batch_size=ORPHAN_BATCH_SIZE, pause=0.05):
+    """Start collect_orphan_parents on a daemon thread; False if one is already running"""
+    if not _orphan_collector_lock.acquire(blocking=False):
+        return False
+
+    def run():
+        try:
+            collect_orphan_parents(batch_size, pause)
+        finally:
+            connection.close()
+            _orphan_collector_lock.release()
+
+    threading.Thread(target=run, name="collect-orphan-parents", daemon=True).start()
+    return True
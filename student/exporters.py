@@ -0,0 +1,64 @@
+import csv
+import tempfile
+
+from .importers import STUDENT_COLUMNS, PARENT_COLUMNS, IMPORT_COLUMNS
+from .models import Student
+
+# Same headers the importer expects, so an export can be re-imported as is
+EXPORT_COLUMNS = IMPORT_COLUMNS
+
+ITERATOR_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the line back instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+
+def iter_student_rows(queryset=None):
+    """Yield one list of cell values per student, parent columns included.
+
+    select_related fetches the parent in the same query and iterator() streams
+    from the database cursor, so only one chunk of rows is held at a time.
+    """
+    if queryset is None:
+        queryset = Student.objects.all()
+    queryset = queryset.select_related('parent').order_by('pk')
+    for student in queryset.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        parent = student.parent
+        yield (
+            [getattr(student, name) for name in STUDENT_COLUMNS]
+            + [getattr(parent, name) for name in PARENT_COLUMNS]
+        )
+
+
+def stream_csv(queryset=None):
+    """Yield the export as CSV text, one line at a time"""
+    writer = csv.writer(Echo())
+    # BOM so Excel opens the UTF-8 file with the right encoding
+    yield '\ufeff' + writer.writerow(EXPORT_COLUMNS)
+    for row in iter_student_rows(queryset):
+        yield writer.writerow(row)
+
+
+def write_xlsx(queryset=None):
+    """Write the export to a temporary XLSX file and return it rewound.
+
+    openpyxl's write-only mode keeps memory flat while rows are appended, but
+    the zip container can only be finished once every row is in, so the
+    caller streams the file afterwards.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Students')
+    sheet.append(EXPORT_COLUMNS)
+    for row in iter_student_rows(queryset):
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
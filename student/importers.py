@@ -0,0 +1,193 @@
+import csv
+import io
+import os
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+from school import ids, search
+from .models import Student, Parent
+
+STUDENT_COLUMNS = (
+    'first_name', 'last_name', 'student_id', 'gender', 'date_of_birth', 'student_class',
+    'religion', 'joining_date', 'mobile_number', 'admission_number', 'section', 'student_email',
+)
+PARENT_COLUMNS = (
+    'father_name', 'father_occupation', 'father_mobile', 'father_email',
+    'mother_name', 'mother_occupation', 'mother_mobile', 'mother_email',
+    'present_address', 'permanent_address',
+)
+IMPORT_COLUMNS = STUDENT_COLUMNS + PARENT_COLUMNS
+
+# Columns that may be left blank (or out of the file) to have IDs assigned
+AUTO_ID_COLUMNS = ('student_id', 'admission_number')
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Stop collecting error messages past this many; counts stay exact
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportResult:
+    """Outcome of a bulk import: rows created plus (row number, message) errors"""
+
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, message))
+
+
+def iter_rows(uploaded_file):
+    """Yield (row_number, {column: value}) from a CSV or XLSX upload, one row at a time"""
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    if extension == '.xlsx':
+        from openpyxl import load_workbook
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+            for row_number, values in enumerate(rows, start=2):
+                if any(value not in (None, '') for value in values):
+                    yield row_number, dict(zip(header, values))
+        finally:
+            workbook.close()
+    elif extension == '.csv':
+        text = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+        reader = csv.DictReader(text)
+        reader.fieldnames = [name.strip() for name in reader.fieldnames or []]
+        for row_number, row in enumerate(reader, start=2):
+            if any(row.values()):
+                yield row_number, row
+    else:
+        raise ValueError("Upload a .csv or .xlsx file")
+
+
+def _clean(model, columns, row):
+    """Validate raw cell values with the model's own field rules"""
+    cleaned = {}
+    errors = []
+    for name in columns:
+        field = model._meta.get_field(name)
+        raw = row.get(name)
+        if raw is None:
+            raw = ''
+        elif isinstance(raw, str):
+            raw = raw.strip()
+        try:
+            cleaned[name] = field.clean(raw, None)
+        except ValidationError as e:
+            errors.append(f"{name}: {' '.join(e.messages)}")
+    return cleaned, errors
+
+
+def _present(value):
+    return value is not None and str(value).strip() != ''
+
+
+def _validate(rows, seen_ids, result):
+    valid = []
+    for row_number, row in rows:
+        columns = [name for name in STUDENT_COLUMNS if name not in AUTO_ID_COLUMNS or _present(row.get(name))]
+        student_data, student_errors = _clean(Student, columns, row)
+        parent_data, parent_errors = _clean(Parent, PARENT_COLUMNS, row)
+        errors = student_errors + parent_errors
+        student_id = student_data.get('student_id')
+        if student_id and student_id in seen_ids:
+            errors.append(f"student_id: {student_id} appears more than once in the file")
+        if errors:
+            result.add_error(row_number, '; '.join(errors))
+            continue
+        if student_id:
+            seen_ids.add(student_id)
+        valid.append((row_number, student_data, parent_data))
+    return valid
+
+
+def _assign_ids(rows):
+    """Fill blank auto-ID columns from their sequences, one reservation per column per chunk"""
+    for name in AUTO_ID_COLUMNS:
+        blank = [student_data for _, student_data, _ in rows if name not in student_data]
+        if blank:
+            for student_data, value in zip(blank, ids.allocate(name, len(blank))):
+                student_data[name] = value
+
+
+def _create(rows):
+    parents = Parent.objects.bulk_create([Parent(**parent_data) for _, _, parent_data in rows])
+    students = []
+    for (_, student_data, _), parent in zip(rows, parents):
+        student = Student(parent=parent, **student_data)
+        # Same slug Student.save() would generate; bulk_create skips save()
+        student.slug = slugify(f"{student.first_name}-{student.last_name}-{student.student_id}")
+        students.append(student)
+    Student.objects.bulk_create(students)
+    # bulk_create skips post_save, which is what normally indexes a student
+    search.index_objects(students)
+
+
+def _import_chunk(rows, seen_ids, result):
+    rows = _validate(rows, seen_ids, result)
+    if not rows:
+        return
+    _assign_ids(rows)
+
+    # One set-based lookup for the whole chunk instead of exists() per row
+    taken = set(Student.objects.filter(
+        student_id__in=[student_data['student_id'] for _, student_data, _ in rows]
+    ).values_list('student_id', flat=True))
+    new_rows = []
+    for row in rows:
+        if row[1]['student_id'] in taken:
+            result.add_error(row[0], f"student_id: {row[1]['student_id']} already exists")
+        else:
+            new_rows.append(row)
+    if not new_rows:
+        return
+
+    try:
+        with transaction.atomic():
+            _create(new_rows)
+        result.created += len(new_rows)
+    except IntegrityError:
+        # Something raced us or collided (e.g. a slug); retry row by row to
+        # pinpoint the offenders without losing the rest of the chunk
+        for row in new_rows:
+            try:
+                with transaction.atomic():
+                    _create([row])
+                result.created += 1
+            except IntegrityError as e:
+                result.add_error(row[0], f"Could not save: {e}")
+
+
+def import_students(uploaded_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream a CSV/XLSX of students with parent details into the database.
+
+    Rows are validated against the model fields and written chunk_size at a
+    time with bulk_create, each chunk in its own transaction, so memory stays
+    flat regardless of file size. Blank student_id and admission_number
+    cells are assigned from their ID sequences. Returns an ImportResult;
+    raises ValueError for an unsupported file type or missing columns.
+    """
+    result = ImportResult()
+    seen_ids = set()
+    rows = iter_rows(uploaded_file)
+    chunk = list(islice(rows, chunk_size))
+    if chunk:
+        missing = [
+            column for column in IMPORT_COLUMNS
+            if column not in chunk[0][1] and column not in AUTO_ID_COLUMNS
+        ]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+    while chunk:
+        _import_chunk(chunk, seen_ids, result)
+        chunk = list(islice(rows, chunk_size))
+    return result
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from student.bulk import collect_orphan_parents, ORPHAN_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Delete Parent rows no student points at, in short batched transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=ORPHAN_BATCH_SIZE, help="Parents deleted per transaction")
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        deleted = collect_orphan_parents(batch_size=options['batch_size'], pause=options['pause'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} orphaned parents in {elapsed:.2f}s"))
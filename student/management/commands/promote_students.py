@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from student.bulk import promote_students, GRADUATING_CLASS
+
+
+class Command(BaseCommand):
+    help = "Year-end rollover: move every current student up one class and archive the graduating class"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--graduating-class', default=GRADUATING_CLASS, help="Class whose students are archived")
+        parser.add_argument('--dry-run', action='store_true', help="Show the plan without changing anything")
+
+    def handle(self, *args, **options):
+        plan = promote_students(dry_run=options['dry_run'], graduating_class=options['graduating_class'])
+        for student_class, target, total in plan:
+            if target is None:
+                outcome = "archived"
+            elif target == student_class:
+                outcome = "unchanged (no class number)"
+            else:
+                outcome = f"-> {target}"
+            self.stdout.write(f"{student_class:>12}  {total:>6} students  {outcome}")
+        action = "Would update" if options['dry_run'] else "Updated"
+        self.stdout.write(self.style.SUCCESS(f"{action} {sum(total for _, _, total in plan)} students"))
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0003_remove_student_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['first_name', 'id'], name='student_stu_first_n_a0ef04_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['student_class', 'section', 'id'], name='student_stu_student_b11dc7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['date_of_birth', 'id'], name='student_stu_date_of_77ca8e_idx'),
+        ),
+    ]
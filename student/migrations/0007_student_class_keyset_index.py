@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0006_student_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='student',
+            name='student_stu_student_b11dc7_idx',
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['student_class', 'id'], name='student_stu_student_45e9a8_idx'),
+        ),
+    ]
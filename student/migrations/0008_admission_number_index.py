@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0007_student_class_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='admission_number',
+            field=models.CharField(db_index=True, max_length=20),
+        ),
+    ]
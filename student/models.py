@@ -31,12 +31,24 @@ class Student(models.Model):
     religion = models.CharField(max_length=50)
     joining_date = models.DateField()
     mobile_number = models.CharField(max_length=15)
-    admission_number = models.CharField(max_length=20)
+    admission_number = models.CharField(max_length=20, db_index=True)
     section = models.CharField(max_length=10)
     student_email = models.EmailField(max_length=100)
     student_image = models.ImageField(upload_to='students/', blank=True)
     parent = models.OneToOneField(Parent, on_delete=models.CASCADE)
     slug = models.SlugField(max_length=255, unique=True, blank=True)
+    # Set at year-end rollover for the graduating class; hidden from the list
+    is_archived = models.BooleanField(default=False, db_index=True)
+    # Indexed so incremental rescoring can find students who lost grades
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        # Keyset pagination of the student list seeks on (sort field, id)
+        indexes = [
+            models.Index(fields=['first_name', 'id']),
+            models.Index(fields=['student_class', 'id']),
+            models.Index(fields=['date_of_birth', 'id']),
+        ]
      
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -1,3 +1,160 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.urls import reverse
+
+from school.pagination import encode_cursor
+
+from .exporters import iter_student_rows, stream_csv, write_xlsx
+from .importers import import_students
+from .models import Parent, Student
+from .views import STUDENT_SORT_FIELDS
+
+
+def _student(first_name, student_id, **fields):
+    parent = Parent.objects.create(
+        father_name="John Müller", father_mobile="5550100", father_email="john@example.com",
+        mother_name="Mary Müller", mother_mobile="5550101", mother_email="mary@example.com",
+        present_address="1 School Road", permanent_address="1 School Road",
+    )
+    values = dict(
+        first_name=first_name, last_name="Müller", student_id=student_id, gender="Female",
+        date_of_birth=datetime.date(2010, 1, 1), student_class="5", religion="None",
+        joining_date=datetime.date(2020, 9, 1), mobile_number="5550102",
+        admission_number=f"ADM-{student_id}", section="A", student_email="pupil@example.com",
+        parent=parent,
+    )
+    values.update(fields)
+    return Student.objects.create(**values)
+
+
+class ExportImportRoundTripTests(TestCase):
+    def setUp(self):
+        _student("Zoë", "S000001")
+        _student("Ana", "S000002", date_of_birth=datetime.date(2011, 12, 31), section="B")
+
+    def _round_trip(self, upload):
+        exported = list(iter_student_rows())
+        Student.objects.all().delete()
+        Parent.objects.all().delete()
+        result = import_students(upload)
+        self.assertEqual((result.created, result.errors), (2, []))
+        self.assertEqual(list(iter_student_rows()), exported)
+
+    def test_csv(self):
+        content = ''.join(stream_csv()).encode('utf-8')
+        self.assertTrue(content.startswith('\ufeff'.encode('utf-8')))
+        self._round_trip(SimpleUploadedFile('students.csv', content))
+
+    def test_xlsx(self):
+        with write_xlsx() as output:
+            content = output.read()
+        self._round_trip(SimpleUploadedFile('students.xlsx', content))
+
+
+class ImportValidationTests(TestCase):
+    HEADER = (
+        "first_name,last_name,student_id,gender,date_of_birth,student_class,religion,joining_date,"
+        "mobile_number,admission_number,section,student_email,father_name,father_occupation,"
+        "father_mobile,father_email,mother_name,mother_occupation,mother_mobile,mother_email,"
+        "present_address,permanent_address\n"
+    )
+    PARENT = "John,,5550100,john@example.com,Mary,,5550101,mary@example.com,1 Road,1 Road"
+
+    def _csv(self, *rows):
+        return SimpleUploadedFile('students.csv', (self.HEADER + ''.join(rows)).encode('utf-8'))
+
+    def _row(self, student_id, date_of_birth='2010-01-01', email='sam@example.com'):
+        return (
+            f"Sam,Lee,{student_id},Male,{date_of_birth},5,None,2020-09-01,5550102,,A,{email},"
+            f"{self.PARENT}\n"
+        )
+
+    def test_malformed_rows_are_rejected_and_the_rest_imported(self):
+        _student("Existing", "S000009")
+        result = import_students(self._csv(
+            self._row('S000001'),
+            self._row('S000002', date_of_birth='31/02/2010'),
+            self._row('S000003', email='not-an-email'),
+            self._row('S000001'),
+            self._row('S000009'),
+            self._row(''),
+        ))
+        self.assertEqual((result.created, result.failed), (2, 4))
+        self.assertEqual([row_number for row_number, _ in result.errors], [3, 4, 5, 6])
+        messages = dict(result.errors)
+        self.assertIn("date_of_birth", messages[3])
+        self.assertIn("student_email", messages[4])
+        self.assertIn("more than once", messages[5])
+        self.assertIn("already exists", messages[6])
+        self.assertEqual(Student.objects.count(), 3)
+        # The blank student_id was assigned one, and so were the admission numbers
+        self.assertFalse(Student.objects.filter(student_id='').exists())
+        self.assertFalse(Student.objects.filter(admission_number='').exists())
+
+    def test_missing_columns(self):
+        upload = SimpleUploadedFile('students.csv', b"first_name,last_name\nSam,Lee\n")
+        with self.assertRaisesMessage(ValueError, "Missing columns"):
+            import_students(upload)
+        self.assertFalse(Student.objects.exists())
+
+    def test_unsupported_file_type(self):
+        with self.assertRaises(ValueError):
+            import_students(SimpleUploadedFile('students.txt', b"first_name\n"))
+
+
+class StudentListPaginationTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='secret')
+        self.client.force_login(user)
+        # Few distinct names, classes and birthdays, so every sort has ties to split by id
+        for n in range(13):
+            _student(
+                ["Ana", "Ben", "Cara"][n % 3], f"S{n:06d}", student_class=str(5 + n % 2),
+                date_of_birth=datetime.date(2010, 1 + n % 4, 1),
+            )
+
+    def _page(self, **params):
+        return self.client.get(reverse('student_list'), {'per_page': 4, **params}).context['page']
+
+    def _pages(self, sort):
+        pages = [self._page(sort=sort)]
+        while pages[-1].has_next:
+            pages.append(self._page(sort=sort, after=pages[-1].next_cursor))
+        return pages
+
+    def test_every_sort_lists_each_student_once(self):
+        for sort, field in STUDENT_SORT_FIELDS.items():
+            for ordering in (field, f'-{field}'):
+                with self.subTest(ordering=ordering):
+                    pages = self._pages(ordering.replace(field, sort))
+                    prefix = ordering[:-len(field)]
+                    expected = list(Student.objects.order_by(ordering, f'{prefix}pk').values_list('pk', flat=True))
+                    self.assertEqual([student.pk for page in pages for student in page], expected)
+
+    def test_previous_cursors_walk_back_over_the_same_pages(self):
+        for sort in ('name', '-dob'):
+            with self.subTest(sort=sort):
+                pages = self._pages(sort)
+                page = pages[-1]
+                walked_back = [page]
+                while page.has_previous:
+                    page = self._page(sort=sort, before=page.previous_cursor)
+                    walked_back.insert(0, page)
+                self.assertEqual(
+                    [[student.pk for student in page] for page in walked_back],
+                    [[student.pk for student in page] for page in pages],
+                )
 
-# Create your tests here.
+    def test_bad_cursor_shows_the_first_page(self):
+        for sort in STUDENT_SORT_FIELDS:
+            first = [student.pk for student in self._page(sort=sort)]
+            cursors = ['garbage', encode_cursor(None, 1), encode_cursor('Ana', 'x')]
+            if sort == 'dob':
+                cursors.append(encode_cursor('not-a-date', 1))
+            for cursor in cursors:
+                response = self.client.get(reverse('student_list'), {'per_page': 4, 'sort': sort, 'after': cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([student.pk for student in response.context['page']], first)
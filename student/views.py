@@ -1,9 +1,27 @@
-from django.http import HttpResponseForbidden
+from django.http import HttpResponseForbidden, StreamingHttpResponse, FileResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
 from .models import Student, Parent
-from school.models import Notification
+from .importers import import_students as run_student_import, IMPORT_COLUMNS
+from .exporters import stream_csv, write_xlsx
+from . import bulk
+from school.notifications import notify
+from school.pagination import keyset_paginate
+from school.conditional import conditional_page
+from school import ids
+
+STUDENT_PAGE_SIZE = 25
+MAX_STUDENT_PAGE_SIZE = 100
+
+# ?sort= value -> model field; prefix with '-' for descending
+STUDENT_SORT_FIELDS = {
+    'student_id': 'student_id',
+    'name': 'first_name',
+    'class': 'student_class',
+    'dob': 'date_of_birth',
+}
 
 @login_required
 def add_student(request):
@@ -32,9 +50,13 @@ def add_student(request):
         present_address = request.POST.get('present_address')
         permanent_address = request.POST.get('permanent_address')
 
-        if Student.objects.filter(student_id=student_id).exists():
+        if not student_id:
+            student_id, = ids.allocate('student_id')
+        elif Student.objects.filter(student_id=student_id).exists():
             messages.error(request, "A student with this Student ID already exists.")
             return render(request, "students/add-student.html")
+        if not admission_number:
+            admission_number, = ids.allocate('admission_number')
 
         try:
             parent = Parent.objects.create(
@@ -65,7 +87,7 @@ def add_student(request):
                 student_image=student_image,
                 parent=parent
             )
-            Notification.objects.create(
+            notify(
                 user=request.user,
                 message=f"Added Student: {student.first_name} {student.last_name}"
             )
@@ -76,6 +98,118 @@ def add_student(request):
             return render(request, "students/add-student.html")
     return render(request, "students/add-student.html")
 
+@login_required
+def import_students(request):
+    context = {'columns': IMPORT_COLUMNS}
+    if request.method == "POST":
+        upload = request.FILES.get('file')
+        if not upload:
+            messages.error(request, "Choose a CSV or XLSX file to import.")
+            return render(request, "students/import-students.html", context)
+        try:
+            result = run_student_import(upload)
+        except ValueError as e:
+            messages.error(request, f"Error importing students: {str(e)}")
+            return render(request, "students/import-students.html", context)
+
+        if result.created:
+            notify(
+                user=request.user,
+                message=f"Imported {result.created} Students from {upload.name}"
+            )
+        if result.failed:
+            messages.warning(request, f"Imported {result.created} students; {result.failed} rows were rejected.")
+        else:
+            messages.success(request, f"Imported {result.created} students successfully!")
+        context['result'] = result
+    return render(request, "students/import-students.html", context)
+
+@login_required
+def export_students(request):
+    export_format = request.GET.get('format', 'csv')
+    if export_format == 'xlsx':
+        return FileResponse(
+            write_xlsx(),
+            as_attachment=True,
+            filename='students.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+    response = StreamingHttpResponse(stream_csv(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="students.csv"'
+    return response
+
+@login_required
+def bulk_students(request):
+    """Year-end promotion, section reassignment and bulk field edits"""
+    if not (request.user.is_admin or request.user.is_superuser):
+        return HttpResponseForbidden()
+
+    if request.method == "POST":
+        action = request.POST.get('action')
+        apply = 'apply' in request.POST
+        try:
+            if action == 'orphans':
+                if bulk.collect_orphan_parents_in_background():
+                    messages.success(request, "Removing orphaned parent records in the background.")
+                else:
+                    messages.info(request, "Orphaned parent records are already being removed.")
+            elif action == 'promote':
+                plan = bulk.promote_students()
+                moved = sum(total for old, new, total in plan if new is not None and new != old)
+                archived = sum(total for _, new, total in plan if new is None)
+                message = f"Promoted {moved} students and archived {archived} graduates"
+                notify(user=request.user, message=message)
+                messages.success(request, message)
+            elif action == 'section':
+                count = bulk.reassign_section(
+                    request.POST.get('student_class', ''), request.POST.get('section', ''),
+                    from_section=request.POST.get('from_section') or None, dry_run=not apply,
+                )
+                if apply:
+                    notify(user=request.user, message=f"Reassigned section of {count} Students")
+                    messages.success(request, f"Moved {count} students to section {request.POST.get('section')}.")
+                else:
+                    messages.info(request, f"{count} students would move to section {request.POST.get('section')}.")
+            elif action == 'edit':
+                students = Student.objects.filter(is_archived=False)
+                if request.POST.get('student_class'):
+                    students = students.filter(student_class=request.POST['student_class'])
+                if request.POST.get('section'):
+                    students = students.filter(section=request.POST['section'])
+                field = request.POST.get('field', '')
+                count = bulk.bulk_update_students(students, {field: request.POST.get('value', '')}, dry_run=not apply)
+                if apply:
+                    notify(user=request.user, message=f"Bulk updated {field} of {count} Students")
+                    messages.success(request, f"Updated {field} of {count} students.")
+                else:
+                    messages.info(request, f"{count} students would have {field} changed.")
+        except (ValueError, ValidationError) as e:
+            messages.error(request, f"Error updating students: {' '.join(getattr(e, 'messages', [str(e)]))}")
+        if apply or action in ('promote', 'orphans'):
+            return redirect('bulk_students')
+
+    context = {
+        'plan': bulk.promotion_plan(),
+        'graduating_class': bulk.GRADUATING_CLASS,
+        'editable_fields': bulk.BULK_EDITABLE_FIELDS,
+        'post': request.POST,
+    }
+    return render(request, "students/bulk-students.html", context)
+
+@login_required
+def bulk_delete_students(request):
+    """Delete the students ticked on the student list, with their parents"""
+    if request.method != "POST" or not (request.user.is_admin or request.user.is_superuser):
+        return HttpResponseForbidden()
+    student_ids = [pk for pk in request.POST.getlist('student') if pk.isdigit()]
+    if not student_ids:
+        messages.error(request, "Select the students to delete.")
+        return redirect('student_list')
+    deleted = bulk.delete_students(student_ids)
+    notify(user=request.user, message=f"Deleted {deleted} Students")
+    messages.success(request, f"Deleted {deleted} students.")
+    return redirect('student_list')
+
 @login_required
 def edit_student(request, slug):
     student = get_object_or_404(Student, slug=slug)
@@ -137,7 +271,7 @@ def edit_student(request, slug):
             student.student_image = student_image
             student.save()
 
-            Notification.objects.create(
+            notify(
                 user=request.user,
                 message=f"Updated Student: {student.first_name} {student.last_name}"
             )
@@ -149,7 +283,12 @@ def edit_student(request, slug):
     return render(request, "students/edit-student.html", {'student': student, 'parent': parent})
 
 
+def _student_page_state(request, slug):
+    row = Student.objects.filter(student_id=slug).values_list('pk', 'updated_at').first()
+    return (row[1], f"student-{row[0]}") if row else None
+
 @login_required
+@conditional_page(_student_page_state)
 def view_student(request, slug):
     student = get_object_or_404(Student, student_id=slug)  # Use student_id
     context = {'student': student}
@@ -160,8 +299,10 @@ def delete_student(request, slug):
     if request.method == "POST":
         student = get_object_or_404(Student, slug=slug)
         student_name = f"{student.first_name} {student.last_name}"
-        student.delete()
-        Notification.objects.create(
+        # Deleting the parent cascades to the student; deleting only the
+        # student would leave the Parent row behind
+        student.parent.delete()
+        notify(
             user=request.user,
             message=f"Deleted Student: {student_name}"
         )
@@ -171,10 +312,58 @@ def delete_student(request, slug):
 
 @login_required
 def student_list(request):
-    students = Student.objects.all()
+    """Keyset-paginated student list, sortable and filterable by class/section"""
+    sort = request.GET.get('sort', 'student_id')
+    if sort.lstrip('-') not in STUDENT_SORT_FIELDS:
+        sort = 'student_id'
+    try:
+        page_size = min(int(request.GET.get('per_page', STUDENT_PAGE_SIZE)), MAX_STUDENT_PAGE_SIZE)
+    except ValueError:
+        page_size = STUDENT_PAGE_SIZE
+    page_size = max(page_size, 1)
+    student_class = request.GET.get('class', '')
+    section = request.GET.get('section', '')
+    archived = request.GET.get('archived') == '1'
+
+    students = Student.objects.select_related('parent').only(
+        'student_id', 'first_name', 'last_name', 'student_class', 'section', 'date_of_birth',
+        'mobile_number', 'student_email', 'student_image', 'slug',
+        'parent__father_name', 'parent__mother_name', 'parent__present_address'
+    ).filter(is_archived=archived)
+    if student_class:
+        students = students.filter(student_class=student_class)
+    if section:
+        students = students.filter(section=section)
+    ordering = ('-' if sort.startswith('-') else '') + STUDENT_SORT_FIELDS[sort.lstrip('-')]
+    page = keyset_paginate(
+        students, ordering,
+        after=request.GET.get('after'), before=request.GET.get('before'), page_size=page_size
+    )
+
+    # Filter choices in one query
+    class_sections = (
+        Student.objects.filter(is_archived=archived).order_by('student_class', 'section')
+        .values_list('student_class', 'section').distinct()
+    )
+
+    # Links keep the current filters; a new sort or filter starts from page one
+    query = request.GET.copy()
+    for key in ('after', 'before'):
+        query.pop(key, None)
+    filter_query = query.copy()
+    filter_query.pop('sort', None)
     context = {
-        'student_list': students,
-        'unread_notification': Notification.objects.filter(user=request.user, is_read=False),
-        'unread_notification_count': Notification.objects.filter(user=request.user, is_read=False).count()
+        'student_list': page,
+        'page': page,
+        'sort': sort,
+        'sort_links': {key: f'-{key}' if sort == key else key for key in STUDENT_SORT_FIELDS},
+        'page_size': page_size,
+        'student_class': student_class,
+        'section': section,
+        'archived': archived,
+        'classes': sorted({row[0] for row in class_sections}),
+        'sections': sorted({row[1] for row in class_sections if not student_class or row[0] == student_class}),
+        'query': query.urlencode(),
+        'filter_query': filter_query.urlencode(),
     }
-    return render(request, "students/students.html", context)
\ No newline at end of file
+    return render(request, "students/students.html", context)
@@ -1,3 +1,12 @@
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from .models import Subject
+
+
+class SubjectListTests(TestCase):
+    def test_anonymous_visitor_is_sent_to_login(self):
+        Subject.objects.create(name="Mathematics", code="MATH101")
+        url = reverse('subject_list')
+        response = self.client.get(url)
+        self.assertRedirects(response, f"{reverse('login')}?next={url}", fetch_redirect_response=False)
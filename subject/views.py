@@ -1,14 +1,27 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Max
 from django.http import HttpResponseForbidden
 from .models import Subject
 from teacher.models import Teacher
-from school.models import Notification
+from school.notifications import notify
+from school.conditional import conditional_page
 
+def _subject_list_state(request):
+    # The list shows each subject's teacher, so teacher edits count too;
+    # the counts catch deletions, which leave no timestamp behind: deleting
+    # a teacher nulls its subjects' teacher without touching updated_at
+    state = Subject.objects.aggregate(
+        latest=Max('updated_at'), teacher_latest=Max('teacher__updated_at'),
+        total=Count('pk'), assigned=Count('teacher'),
+    )
+    stamps = [stamp for stamp in (state['latest'], state['teacher_latest']) if stamp is not None]
+    return (max(stamps), f"subjects-{state['total']}-{state['assigned']}") if stamps else None
+
+@login_required(login_url='login')
+@conditional_page(_subject_list_state)
 def subject_list(request):
-    if not request.user.is_authenticated:
-        messages.error(request, "You must be logged in to view subjects.")
-        return redirect('login')
     subjects = Subject.objects.all()
     return render(request, 'subjects/subject-list.html', {'subjects': subjects})
 
@@ -27,7 +40,7 @@ def add_subject(request):
             description=request.POST.get('description', '')
         )
         subject.save()
-        Notification.objects.create(
+        notify(
             user=request.user,
             message=f"Added Subject: {subject.name}"
         )
@@ -50,7 +63,7 @@ def edit_subject(request, code):
         subject.teacher_id = request.POST.get('teacher')
         subject.description = request.POST.get('description', '')
         subject.save()
-        Notification.objects.create(
+        notify(
             user=request.user,
             message=f"Updated Subject: {subject.name}"
         )
@@ -70,7 +83,7 @@ def delete_subject(request, code):
     if request.method == "POST":
         subject_name = subject.name
         subject.delete()
-        Notification.objects.create(
+        notify(
             user=request.user,
             message=f"Deleted Subject: {subject_name}"
         )
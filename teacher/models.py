@@ -16,6 +16,7 @@ class Teacher(models.Model):
     address = models.TextField()
     teacher_image = models.ImageField(upload_to='teachers/', blank=True)
     slug = models.SlugField(max_length=255, unique=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -1,3 +1,31 @@
+import datetime
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+
+from .models import Teacher
+
+
+class ViewTeacherTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='jdoe', password='secret', is_teacher=True)
+        self.teacher = Teacher.objects.create(
+            user=user, first_name="Jane", last_name="Doe", teacher_id="T0001", gender="Female",
+            date_of_birth=datetime.date(1985, 4, 2), department="Science", mobile_number="5550100",
+            email="jane@example.com", joining_date=datetime.date(2020, 9, 1), address="1 School Road",
+        )
+
+    def test_anonymous_visitor_is_sent_to_login(self):
+        url = reverse('view_teacher', args=[self.teacher.slug])
+        response = self.client.get(url)
+        self.assertRedirects(response, f"{reverse('login')}?next={url}", fetch_redirect_response=False)
 
-# Create your tests here.
+    def test_anonymous_visitor_cannot_revalidate(self):
+        # The login check runs before the page's ETag is compared
+        url = reverse('view_teacher', args=[self.teacher.slug])
+        self.client.force_login(self.teacher.user)
+        etag = self.client.get(url)['ETag']
+        self.client.logout()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 302)
@@ -1,10 +1,12 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import HttpResponseForbidden
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from .models import Teacher
-from school.models import Notification
+from school.notifications import notify
+from school.conditional import conditional_page
+from school import ids
 from django.shortcuts import render
-from notifications.models import Notification
 
 def add_teacher(request):
     if request.method == "POST":
@@ -19,6 +21,8 @@ def add_teacher(request):
         joining_date = request.POST.get('joining_date')
         address = request.POST.get('address')
         teacher_image = request.FILES.get('teacher_image')
+        if not teacher_id:
+            teacher_id, = ids.allocate('teacher_id')
 
         teacher = Teacher.objects.create(
             user=request.user,
@@ -34,7 +38,7 @@ def add_teacher(request):
             address=address,
             teacher_image=teacher_image
         )
-        Notification.objects.create(
+        notify(
             user=request.user,
             message=f"Added Teacher: {teacher.first_name} {teacher.last_name}"
         )
@@ -44,10 +48,8 @@ def add_teacher(request):
 
 def teacher_list(request):
     teacher_list = Teacher.objects.all()
-    unread_notification = Notification.objects.filter(user=request.user, is_read=False)
     context = {
         'teacher_list': teacher_list,
-        'unread_notification': unread_notification
     }
     return render(request, "teachers/teachers.html", context)
 
@@ -66,7 +68,7 @@ def edit_teacher(request, slug):
         teacher.address = request.POST.get('address')
         teacher.teacher_image = request.FILES.get('teacher_image') if request.FILES.get('teacher_image') else teacher.teacher_image
         teacher.save()
-        Notification.objects.create(
+        notify(
             user=request.user,
             message=f"Updated Teacher: {teacher.first_name} {teacher.last_name}"
         )
@@ -74,6 +76,12 @@ def edit_teacher(request, slug):
         return redirect("teacher_list")
     return render(request, "teachers/edit-teacher.html", {'teacher': teacher})
 
+def _teacher_page_state(request, slug):
+    row = Teacher.objects.filter(slug=slug).values_list('pk', 'updated_at').first()
+    return (row[1], f"teacher-{row[0]}") if row else None
+
+@login_required(login_url='login')
+@conditional_page(_teacher_page_state)
 def view_teacher(request, slug):
     teacher = get_object_or_404(Teacher, slug=slug)
     context = {
@@ -86,7 +94,7 @@ def delete_teacher(request, slug):
         teacher = get_object_or_404(Teacher, slug=slug)
         teacher_name = f"{teacher.first_name} {teacher.last_name}"
         teacher.delete()
-        Notification.objects.create(
+        notify(
             user=request.user,
             message=f"Deleted Teacher: {teacher_name}"
         )